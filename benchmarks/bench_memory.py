@@ -0,0 +1,43 @@
+# Memory used by the parsed IR (SqlSchema + every table's Column list) for a
+# large synthetic schema: live allocations and traced peak via tracemalloc,
+# and the process peak RSS.
+#
+#   python -m benchmarks.bench_memory [TABLE_COUNT]
+
+import gc
+import resource
+import sys
+import tracemalloc
+
+from benchmarks.synthetic_schema import generate_schema
+from src.classes import EnumRegistry
+from src.sql_parser import parse_sql_schema
+from src.utils import parse_sql_enums, parse_table_columns
+
+
+if __name__ == "__main__":
+    table_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    content = generate_schema(table_count)
+
+    gc.collect()
+    tracemalloc.start()
+    schema = parse_sql_schema(content)
+    enum_registry = EnumRegistry(parse_sql_enums(schema))
+    tables = [parse_table_columns(table, schema, enum_registry) for table in schema.tables]
+    # camel / cap_camel are what the emitters read
+    for table_columns in tables:
+        for column in table_columns:
+            column.column_name.camel, column.table_name.cap_camel, column.related_table_name.cap_camel
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot()
+    live_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    live_blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    column_count = sum(len(table_columns) for table_columns in tables)
+    peak_rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"tables: {table_count}, columns: {column_count}")
+    print(f"live IR:         {live_bytes / 1024 / 1024:8.1f} MiB in {live_blocks} blocks")
+    print(f"traced peak:     {peak_bytes / 1024 / 1024:8.1f} MiB")
+    print(f"bytes / column:  {live_bytes / column_count:8.0f}")
+    print(f"peak RSS:        {peak_rss_kib / 1024:8.1f} MiB")
@@ -0,0 +1,72 @@
+# File system calls and wall time of writing a generated project, counted
+# with audit hooks (open, rename, remove, mkdir, ...) plus a counting os.stat,
+# for a fresh project, a forced run with identical output and a run after
+# every table changed.
+#
+#   python -m benchmarks.bench_output [TABLE_COUNT]
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.synthetic_schema import generate_schema
+from src.api import generate
+from src.utils import set_quiet
+
+
+COUNTED_EVENTS = {"open", "os.rename", "os.remove", "os.mkdir", "os.rmdir", "os.listdir", "os.scandir", "shutil.rmtree"}
+
+calls: Counter = Counter()
+
+
+def audit(event: str, args):
+    if event in COUNTED_EVENTS:
+        calls[event] += 1
+
+
+def counting_stat(original):
+    def stat(*args, **kwargs):
+        calls["os.stat"] += 1
+        return original(*args, **kwargs)
+
+    return stat
+
+
+def measure(label: str, project_root: str, **options):
+    calls.clear()
+    started = time.perf_counter()
+    result = generate(project_root, **options)
+    elapsed = time.perf_counter() - started
+    file_count = len(result.written_files) + len(result.unchanged_files)
+    total = sum(calls.values())
+    print(f"{label:<22}{file_count:>7} files{total:>9} calls{total / max(file_count, 1):>7.1f} / file{elapsed * 1000:>9.0f} ms")
+    print(f"{'':<22}{dict(sorted(calls.items()))}")
+
+
+if __name__ == "__main__":
+    table_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    set_quiet(True)
+
+    project_root = os.path.join(tempfile.mkdtemp(), "bench_app")
+    sqls_directory = os.path.join(project_root, "lib", "sqls")
+    os.makedirs(sqls_directory)
+    schema_path = os.path.join(sqls_directory, "schema.sql")
+    with open(schema_path, "w") as f:
+        f.write(generate_schema(table_count))
+
+    os.stat = counting_stat(os.stat)
+    sys.addaudithook(audit)
+    try:
+        measure("fresh project", project_root, use_cache=False)
+        measure("forced, same output", project_root, force=True, use_cache=False)
+        # every table has a varchar column, their models stay but views change
+        with open(schema_path) as f:
+            content = f.read().replace(" varchar", " text")
+        with open(schema_path, "w") as f:
+            f.write(content)
+        measure("every table changed", project_root, use_cache=False)
+    finally:
+        shutil.rmtree(os.path.dirname(project_root))
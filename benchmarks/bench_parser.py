@@ -0,0 +1,77 @@
+# Compare the single-pass tokenizer/parser with the previous regex stack on a
+# large synthetic schema. For per-phase timings see benchmarks/run_benchmarks.py.
+#
+#   python -m benchmarks.bench_parser [TABLE_COUNT]
+
+import re
+import sys
+import time
+from typing import Callable, List
+
+from benchmarks.synthetic_schema import generate_schema
+from src.classes import EnumRegistry
+from src.sql_parser import parse_sql_schema
+from src.utils import parse_sql_enums, parse_table_columns
+
+
+# src.utils.lowercase_sql_keywords() before it was moved onto the tokenizer
+LEGACY_SQL_KEYWORDS = [
+    "SELECT", "FROM", "WHERE", "INSERT", "INTO", "VALUES", "UPDATE", "SET", "DELETE", "CREATE", "TABLE", "ALTER", "ADD", "DROP", "COLUMN", "CONSTRAINT", "PRIMARY", "KEY", "FOREIGN", "REFERENCES", "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "OUTER", "ON", "GROUP", "BY", "ORDER", "HAVING", "DISTINCT", "UNION", "ALL", "AND", "OR", "NOT", "NULL", "IS", "IN", "EXISTS", "BETWEEN", "LIKE", "LIMIT", "OFFSET"
+]
+
+
+def legacy_parse(content: str) -> int:
+    # The regex pipeline main.py used before the tokenizer, kept here as the baseline
+    content = content.replace('"', "")
+    for keyword in LEGACY_SQL_KEYWORDS:
+        content = content.replace(keyword, keyword.lower())
+    create_table_pattern = re.compile(r"(?<!-- )create table \w+ \([\s\S]*?\);", re.IGNORECASE)
+    enum_pattern = re.compile(r'CREATE\s+TYPE\s+"?(\w+)"?\s+AS\s+ENUM\s*\(\s*([\s\S]*?)\s*\);', re.IGNORECASE)
+    enum_names = [match[0] for match in enum_pattern.findall(content)]
+    column_count = 0
+    for statement in create_table_pattern.findall(content):
+        match = re.compile(r"create table (\w+) \(([\s\S]*?)\);", re.IGNORECASE).search(statement)
+        if not match:
+            continue
+        foreign_keys = re.compile(
+            r"ALTER\s+TABLE\s+\"?(\w+)\"?\s+ADD\s+FOREIGN\s+KEY\s+\(\"?(\w+)\"?\)\s+REFERENCES\s+\"?(\w+\"?\.?\"?\w+)\"?\s+\(\"?(\w+)\"?\)\s?(ON\s+DELETE\s+\w+\s?)?(ON\s+UPDATE\s+\w+\s?)?;",
+            re.IGNORECASE,
+        ).findall(content)
+        for column in match.group(2).split(","):
+            column_name, column_type = column.split()[:2]
+            for foreign_key in foreign_keys:
+                if column_name == foreign_key[1] and match.group(1) == foreign_key[0]:
+                    break
+            for enum_name in enum_names:
+                if column_type == enum_name:
+                    break
+            column_count += 1
+    return column_count
+
+
+def current_parse(content: str) -> int:
+    schema = parse_sql_schema(content)
+    enum_registry = EnumRegistry(parse_sql_enums(schema))
+    return sum(len(parse_table_columns(table, schema, enum_registry)) for table in schema.tables)
+
+
+def best_of(func: Callable[[str], int], content: str, repeat: int = 3) -> float:
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    table_count = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    content = generate_schema(table_count)
+    assert legacy_parse(content) == current_parse(content)
+
+    legacy_seconds = best_of(legacy_parse, content)
+    current_seconds = best_of(current_parse, content)
+    print(f"tables: {table_count}, sql size: {len(content) / 1024:.0f} KiB")
+    print(f"regex stack:      {legacy_seconds * 1000:9.1f} ms")
+    print(f"single-pass lexer:{current_seconds * 1000:9.1f} ms")
+    print(f"speedup:          {legacy_seconds / current_seconds:9.1f}x")
@@ -0,0 +1,102 @@
+# Time from saving a SQL file to the regenerated files on disk in --watch
+# mode, for a synthetic schema in one file and split over several files. The
+# watcher is replaced by one that edits table_0 and returns at once, so the
+# debounce delay is not included.
+#
+#   python -m benchmarks.bench_watch [TABLE_COUNT] [FILE_COUNT]
+
+import contextlib
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+from benchmarks.synthetic_schema import generate_schema
+from src import watch
+from src.api import generate
+from src.utils import set_quiet
+
+
+TABLE_0_HEADER = 'CREATE TABLE "table_0" (\n'
+
+# (label, line added to table_0), every edit starts from the original file
+EDITS = [
+    ("nullable column", '  "extra" bigint,\n'),
+    ("not null column", '  "extra" varchar NOT NULL,\n'),
+    ("reverted", ""),
+]
+
+WATCH_LINE_PATTERN = re.compile(r"regenerated (\d+), files written (\d+)")
+
+
+def split_schema(content: str, file_count: int) -> List[str]:
+    # Consecutive tables per file. Foreign keys are inline, so every file only
+    # references tables of its own or of earlier files.
+    blocks = [block for block in content.split("\n\n") if block.strip()]
+    per_file = -(-len(blocks) // file_count)
+    return ["\n\n".join(blocks[idx : idx + per_file]) + "\n" for idx in range(0, len(blocks), per_file)]
+
+
+class ScriptedWatcher:
+    # Applies one edit per wait() and records when the previous one was done
+    def __init__(self, file_path: str, original: str):
+        self.file_path = file_path
+        self.original = original
+        self.edit_idx = 0
+        self.saved_at = 0.0
+        self.timings: List[float] = []
+
+    def wait(self):
+        if self.edit_idx:
+            self.timings.append(time.perf_counter() - self.saved_at)
+        if self.edit_idx == len(EDITS):
+            raise KeyboardInterrupt
+        _, line = EDITS[self.edit_idx]
+        self.edit_idx += 1
+        # a new mtime for every save, even on a coarse clock
+        time.sleep(0.01)
+        self.saved_at = time.perf_counter()
+        with open(self.file_path, "w") as f:
+            f.write(self.original.replace(TABLE_0_HEADER, TABLE_0_HEADER + line, 1))
+        return {os.path.basename(self.file_path)}
+
+    def close(self):
+        pass
+
+
+def measure(table_count: int, file_count: int) -> List[Tuple[str, float, str]]:
+    project_root = os.path.join(tempfile.mkdtemp(), "bench_app")
+    sqls_directory = os.path.join(project_root, "lib", "sqls")
+    os.makedirs(sqls_directory)
+    contents = split_schema(generate_schema(table_count, enum_count=0, alter_table_foreign_keys=False), file_count)
+    for idx, content in enumerate(contents):
+        with open(os.path.join(sqls_directory, f"schema_{idx:03}.sql"), "w") as f:
+            f.write(content)
+
+    try:
+        result = generate(project_root)
+        watcher = ScriptedWatcher(os.path.join(sqls_directory, "schema_000.sql"), contents[0])
+        watch.create_watcher = lambda directory: watcher
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            watch.watch(result.lib_directory, result.project_name, result.parsed_files, result.manifest, result.schema_cache)
+    finally:
+        shutil.rmtree(os.path.dirname(project_root))
+
+    counts = [match.group(0) for match in WATCH_LINE_PATTERN.finditer(output.getvalue())]
+    return [(label, seconds, count) for (label, _), seconds, count in zip(EDITS, watcher.timings, counts)]
+
+
+if __name__ == "__main__":
+    table_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    file_counts = [int(sys.argv[2])] if len(sys.argv) > 2 else [1, 10, 100]
+    set_quiet(True)
+
+    for file_count in file_counts:
+        print(f"{table_count} tables in {file_count} file(s), table_0 edited:")
+        for label, seconds, count in measure(table_count, file_count):
+            print(f"  {label:<18}{seconds * 1000:>8.0f} ms   {count}")
@@ -0,0 +1,150 @@
+# Time every parse and emit phase on synthetic schemas of growing size.
+#
+#   python -m benchmarks.run_benchmarks run [--sizes 10 100 1000 10000] [--output results.json]
+#   python -m benchmarks.run_benchmarks compare BASELINE.json CURRENT.json [--threshold 0.1]
+#
+# compare exits with status 1 when a phase got slower than the threshold.
+
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.synthetic_schema import generate_schema
+from src.classes import EnumRegistry
+from src.manifest import GENERATOR_VERSION
+from src.projection import related_tables_of
+from src.sql_parser import parse_sql_schema
+from src.sql_to_enum import renderEnumClass
+from src.sql_to_model import renderModel
+from src.sql_to_provider import renderProvider
+from src.sql_to_view import renderView
+from src.utils import lowercase_sql_keywords, parse_sql_enums, parse_table_columns
+
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+PROJECT_NAME = "benchmark_app"
+
+# Differences below this are noise, whatever the relative change
+MIN_SIGNIFICANT_SECONDS = 0.002
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark_size(table_count: int, repeat: int, schema_options: Dict[str, Any]) -> Dict[str, float]:
+    content = generate_schema(table_count, **schema_options)
+    schema = parse_sql_schema(content)
+    enums = parse_sql_enums(schema)
+    enum_registry = EnumRegistry(enums)
+    tables = [parse_table_columns(table, schema, enum_registry) for table in schema.tables]
+    # what generate_files hands the emitters, so embeds and lookup providers are timed too
+    tables_by_name = {table_columns[0].table_name.snake: table_columns for table_columns in tables}
+    referenced_tables = {column.related_table_name.snake for table_columns in tables for column in table_columns}
+    related_tables = [related_tables_of(table_columns, tables_by_name) for table_columns in tables]
+    referenced = [table_columns[0].table_name.snake in referenced_tables for table_columns in tables]
+
+    phases: Dict[str, Callable[[], Any]] = {
+        "lowercase_sql_keywords": lambda: lowercase_sql_keywords(content),
+        "parse_sql_schema": lambda: parse_sql_schema(content),
+        "parse_sql_enums": lambda: parse_sql_enums(schema),
+        "parse_table_columns": lambda: [parse_table_columns(table, schema, enum_registry) for table in schema.tables],
+        "renderModel": lambda: [renderModel(table_columns, PROJECT_NAME) for table_columns in tables],
+        "renderProvider": lambda: [
+            renderProvider(table_columns, PROJECT_NAME, table_related_tables, table_referenced)
+            for table_columns, table_related_tables, table_referenced in zip(tables, related_tables, referenced)
+        ],
+        "renderView": lambda: [
+            renderView(table_columns, PROJECT_NAME, table_related_tables)
+            for table_columns, table_related_tables in zip(tables, related_tables)
+        ],
+        "renderEnumClass": lambda: [renderEnumClass(sql_enum) for sql_enum in enums],
+    }
+    return {name: best_of(func, repeat) for name, func in phases.items()}
+
+
+def run(args: argparse.Namespace):
+    schema_options = {
+        "columns_per_table": args.columns_per_table,
+        "fk_density": args.fk_density,
+        "enum_count": args.enum_count,
+        "alter_table_foreign_keys": not args.inline_foreign_keys,
+    }
+    results: Dict[str, Dict[str, float]] = {}
+    for table_count in args.sizes:
+        # fewer repeats for the big schemas, they are less noisy anyway
+        repeat = args.repeat if table_count < 10000 else 1
+        results[str(table_count)] = benchmark_size(table_count, repeat, schema_options)
+        print(f"{table_count:>6} tables: " + ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in results[str(table_count)].items()))
+
+    report = {
+        "meta": {
+            "generator_version": GENERATOR_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "schema": schema_options,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f">> Benchmark results written to {args.output}")
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)["results"]
+    with open(args.current, "r") as f:
+        current = json.load(f)["results"]
+
+    regressions = 0
+    print(f"{'tables':>6}  {'phase':<24}{'baseline ms':>12}{'current ms':>12}{'change':>9}")
+    for table_count, phases in current.items():
+        for name, seconds in phases.items():
+            baseline_seconds = baseline.get(table_count, {}).get(name)
+            if baseline_seconds is None:
+                continue
+            change = (seconds - baseline_seconds) / baseline_seconds if baseline_seconds else 0.0
+            is_regression = change > args.threshold and seconds - baseline_seconds > MIN_SIGNIFICANT_SECONDS
+            regressions += is_regression
+            print(
+                f"{table_count:>6}  {name:<24}{baseline_seconds * 1000:>12.1f}{seconds * 1000:>12.1f}{change:>+9.0%}"
+                + ("  REGRESSION" if is_regression else "")
+            )
+
+    print(f">> {regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the SQL parser and the Dart emitters.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and write a JSON report")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Table counts to benchmark")
+    run_parser.add_argument("--columns-per-table", type=int, default=8)
+    run_parser.add_argument("--fk-density", type=float, default=0.25, help="Share of columns that are foreign keys")
+    run_parser.add_argument("--enum-count", type=int, default=4)
+    run_parser.add_argument("--inline-foreign-keys", action="store_true", help="Use REFERENCES instead of ALTER TABLE")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Best of N runs per phase")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+
+    compare_parser = subparsers.add_parser("compare", help="Flag phases that got slower than a baseline report")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown, 0.1 = 10%%")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
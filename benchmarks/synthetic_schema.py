@@ -0,0 +1,59 @@
+# Synthetic Postgres schemas for the benchmarks, shaped like dbdiagram.io
+# exports: quoted identifiers, CREATE TYPE ... AS ENUM and foreign keys added
+# with ALTER TABLE at the end of the file.
+
+import random
+from typing import List
+
+# Plain column types, cycled through for the non-key columns
+COLUMN_TYPES = ["varchar", "text", "bigint", "real", "date", "uuid"]
+
+
+def generate_schema(
+    table_count: int,
+    columns_per_table: int = 8,
+    fk_density: float = 0.25,
+    enum_count: int = 4,
+    alter_table_foreign_keys: bool = True,
+    seed: int = 0,
+) -> str:
+    # fk_density is the share of each table's columns that reference an
+    # earlier table. With alter_table_foreign_keys the references are added
+    # with ALTER TABLE statements, otherwise inline with REFERENCES.
+    rng = random.Random(seed)
+    lines: List[str] = []
+
+    for enum_idx in range(enum_count):
+        values = ", ".join(f"'value_{value_idx}'" for value_idx in range(5))
+        lines.append(f'CREATE TYPE "enum_{enum_idx}" AS ENUM ({values});')
+    lines.append("")
+
+    alter_lines: List[str] = []
+    for table_idx in range(table_count):
+        table_name = f"table_{table_idx}"
+        column_lines = ['  "id" bigint PRIMARY KEY']
+        for column_idx in range(columns_per_table):
+            column_name = f"column_{column_idx}"
+            if table_idx > 0 and rng.random() < fk_density:
+                related_table_name = f"table_{rng.randrange(table_idx)}"
+                column_name = f"{column_name}_id"
+                if alter_table_foreign_keys:
+                    column_lines.append(f'  "{column_name}" bigint')
+                    alter_lines.append(
+                        f'ALTER TABLE "{table_name}" ADD FOREIGN KEY ("{column_name}") REFERENCES "{related_table_name}" ("id") ON DELETE CASCADE;'
+                    )
+                else:
+                    column_lines.append(f'  "{column_name}" bigint REFERENCES "{related_table_name}" ON DELETE CASCADE')
+            elif enum_count and rng.random() < 0.1:
+                column_lines.append(f'  "{column_name}" enum_{rng.randrange(enum_count)}')
+            else:
+                column_type = COLUMN_TYPES[column_idx % len(COLUMN_TYPES)]
+                not_null = " NOT NULL" if rng.random() < 0.3 else ""
+                column_lines.append(f'  "{column_name}" {column_type}{not_null}')
+        lines.append(f'CREATE TABLE "{table_name}" (')
+        lines.append(",\n".join(column_lines))
+        lines.append(");")
+        lines.append("")
+
+    lines.extend(alter_lines)
+    return "\n".join(lines) + "\n"
@@ -1,83 +1,134 @@
-import os
-import re
 import argparse
-from typing import List
-
-from src.sql_to_enum import sqlEnumsToDartClasses
-from src.classes import Column
-from src.sql_to_view import sqlToView
-from src.sql_to_model import sqlToModel
-from src.sql_to_provider import sqlToProvider
-
-from src.utils import extract_last_folder_name, lowercase_sql_keywords, parse_sql_enums, parse_table_columns
-
-
-parser = argparse.ArgumentParser(description="Process the FLUTTER_PROJECT_ROOT_PATH.")
-parser.add_argument(
-    "FLUTTER_PROJECT_ROOT_PATH", type=str, help="The root path of the Flutter project"
-)
-
-args = parser.parse_args()
-
-FLUTTER_PROJECT_ROOT_PATH = args.FLUTTER_PROJECT_ROOT_PATH
-
+import os
+import sys
 
-if not os.path.exists(FLUTTER_PROJECT_ROOT_PATH):
-    raise FileNotFoundError(f"Directory not found: {FLUTTER_PROJECT_ROOT_PATH}")
 
-# if in the dir does not find a folder called "lib", and no pub.yaml / pub.yml file then it is not a flutter project, raise an error
-if not os.path.exists(os.path.join(FLUTTER_PROJECT_ROOT_PATH, "lib")):
-    raise FileNotFoundError(
-        f"Directory does not contain a 'lib' folder: {FLUTTER_PROJECT_ROOT_PATH}, maybe it is not a Flutter project."
+def main():
+    parser = argparse.ArgumentParser(description="Process the FLUTTER_PROJECT_ROOT_PATH.")
+    parser.add_argument(
+        "FLUTTER_PROJECT_ROOT_PATH", type=str, help="The root path of the Flutter project"
     )
 
-
-PROJECT_NAME = extract_last_folder_name(FLUTTER_PROJECT_ROOT_PATH)
-
-sqls_directory = os.path.join(FLUTTER_PROJECT_ROOT_PATH, "lib", "sqls")
-
-if not os.path.exists(sqls_directory):
-    raise FileNotFoundError(
-        f"Directory not found: {sqls_directory}, please create a 'sqls' folder under 'lib' and add your SQL files."
+    parser.add_argument(
+        "--force", action="store_true", help="Regenerate every file, ignoring lib/.sfrf_manifest.json"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Parse every SQL file, bypassing the schema cache"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, metavar="N", help="Render tables and enums with N worker processes"
+    )
+    parser.add_argument(
+        "--targets",
+        default="models,providers,views,enums",
+        metavar="TARGETS",
+        help="Comma separated kinds of files to generate: models, providers, views, enums (default: all)",
+    )
+    parser.add_argument(
+        "--tables", metavar="TABLES", help="Comma separated tables to generate (default: all)"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only list the files that would be written or removed, lib/ stays untouched"
+    )
+    parser.add_argument(
+        "--stdout",
+        nargs="?",
+        const="tar",
+        choices=["tar", "zip"],
+        metavar="FORMAT",
+        help="Write every generated file into one tar or zip archive on stdout instead of lib/ (default: tar)",
+    )
+    parser.add_argument(
+        "--watch", action="store_true", help="Keep running and regenerate whenever a file in lib/sqls changes"
     )
 
-models_directory = os.path.join(FLUTTER_PROJECT_ROOT_PATH, "lib", "models")
-providers_directory = os.path.join(FLUTTER_PROJECT_ROOT_PATH, "lib", "providers")
-views_directory = os.path.join(FLUTTER_PROJECT_ROOT_PATH, "lib", "views")
-enums_directory = os.path.join(FLUTTER_PROJECT_ROOT_PATH, "lib", "sql_enums_dart_classes")
-
-directories = [models_directory, providers_directory, views_directory, enums_directory]
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="sfrf_profile.json",
+        metavar="JSON_PATH",
+        help="Print per-phase timings, artifact sizes and peak memory, and dump them as JSON (default: sfrf_profile.json)",
+    )
+    parser.add_argument(
+        "--quiet", action="store_true", help="Only print the summary, not every file"
+    )
 
-for directory in directories:
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-        print(f"Created directory: {directory}")
+    args = parser.parse_args()
+    if args.watch and (args.dry_run or args.stdout):
+        parser.error("--watch writes to lib/, it can't be combined with --dry-run or --stdout")
+    if args.dry_run and args.stdout:
+        parser.error("--dry-run and --stdout can't be combined")
+
+    # Imported after parsing, so --help doesn't pay for them
+    from src.api import generate
+    from src.output import ArchiveSink, DryRunSink
+    from src.profiling import PROFILER
+    from src.utils import set_quiet
+
+    sink = None
+    if args.stdout:
+        # stdout only carries the archive, progress goes to stderr
+        sink = ArchiveSink(sys.stdout.buffer, args.stdout)
+        sys.stdout = sys.stderr
+    elif args.dry_run:
+        sink = DryRunSink(os.path.join(args.FLUTTER_PROJECT_ROOT_PATH, "lib"))
+
+    set_quiet(args.quiet)
+    if args.profile:
+        # worker processes would not report their timings
+        if args.jobs > 1:
+            print(">> --profile renders in a single process, ignoring --jobs")
+            args.jobs = 1
+        PROFILER.start()
+
+    targets = [target.strip() for target in args.targets.split(",") if target.strip()]
+    tables = [table.strip() for table in args.tables.split(",") if table.strip()] if args.tables else None
+
+    result = generate(
+        args.FLUTTER_PROJECT_ROOT_PATH,
+        targets=targets,
+        tables=tables,
+        force=args.force,
+        use_cache=not args.no_cache,
+        jobs=args.jobs,
+        sink=sink,
+    )
+    stats = result.stats
+    if args.dry_run:
+        for relative_path in sink.changed:
+            print(f">> Would write {os.path.join(result.lib_directory, relative_path)}")
+        for relative_path in sink.removed:
+            print(f">> Would remove {os.path.join(result.lib_directory, relative_path)}")
+        print(
+            f"\n>> Dry run, files that would be written: {len(sink.changed)}, unchanged: {stats.unchanged_file_count}, "
+            f"removed: {len(sink.removed)}"
+        )
     else:
-        print(f"Directory already exists: {directory}")
-
-# Regex pattern to match CREATE TABLE statements
-create_table_pattern = re.compile(
-    r"(?<!-- )create table \w+ \([\s\S]*?\);", re.IGNORECASE
-)
-
-# Loop through each file in the directory
-for file in os.listdir(sqls_directory):
-    file_path = os.path.join(sqls_directory, file)
-    if os.path.isfile(file_path):
-        with open(file_path, "r") as f:
-            content = f.read()
-            # Find and delete all double quotes in content
-            content = content.replace('"', "")
-            content = lowercase_sql_keywords(content)
-            # Find all CREATE TABLE statements
-            create_table_statements:List[str] = create_table_pattern.findall(content)
-            # Loop through and print each statement
-            enums = parse_sql_enums(content)
-            for statement in create_table_statements:
-                print(f"\n\n>> create table statement: \n\n{statement}")
-                table_columns: List[Column] = parse_table_columns(statement, content, enums) or []
-
-                sqlToModel(table_columns, models_directory, PROJECT_NAME, enums)
-                # sqlToProvider(table_columns, providers_directory, PROJECT_NAME)
-                # sqlToView(table_columns, views_directory, PROJECT_NAME, enums)
-                # sqlEnumsToDartClasses(enums, enums_directory)
+        print(f"\n>> Regenerated: {stats.regenerated_count}, unchanged: {stats.unchanged_count}")
+        print(
+            f">> Files written: {stats.written_file_count}, files unchanged: {stats.unchanged_file_count}, "
+            f"files removed: {len(stats.removed_files)}"
+        )
+
+    if args.profile:
+        report = PROFILER.report()
+        PROFILER.print_summary(report)
+        PROFILER.dump(report, args.profile)
+
+    if args.watch:
+        from src.watch import watch
+
+        watch(
+            result.lib_directory,
+            result.project_name,
+            result.parsed_files,
+            result.manifest,
+            result.schema_cache,
+            jobs=args.jobs,
+            targets=targets,
+            tables=tables,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import os
+from typing import Collection, Dict, List, Sequence
+
+from src.classes import ParsedSqlFile
+from src.dependency_graph import ForeignKeyGraph
+from src.generator import GenerationStats, generate_files, list_sql_files
+from src.manifest import MANIFEST_FILE_NAME, Manifest, settings_fingerprint
+from src.output import FileSystemSink, OutputSink
+from src.profiling import PROFILER
+from src.schema_cache import SCHEMA_CACHE_FILE_NAME, SchemaCache
+from src.targets import TARGET_FOLDERS, TARGETS
+from src.templating import TEMPLATE_CACHE_FILE_NAME, TEMPLATE_OVERRIDES_FOLDER, TEMPLATES
+from src.utils import extract_last_folder_name, log, parse_sql_file_tables, project_cache_directory
+
+
+class GenerationResult:
+    # What generate() did. parsed_files, manifest and schema_cache are the
+    # state --watch keeps using after the first run.
+    def __init__(
+        self,
+        project_name: str,
+        lib_directory: str,
+        stats: GenerationStats,
+        parsed_files: Dict[str, ParsedSqlFile],
+        manifest: Manifest,
+        schema_cache: SchemaCache | None,
+    ):
+        self.project_name = project_name
+        self.lib_directory = lib_directory
+        self.stats = stats
+        self.parsed_files = parsed_files
+        self.manifest = manifest
+        self.schema_cache = schema_cache
+
+    @property
+    def tables(self) -> List[str]:
+        return [
+            table_columns[0].table_name.snake
+            for parsed in self.parsed_files.values()
+            for table_columns in parsed.tables
+        ]
+
+    @property
+    def enums(self) -> List[str]:
+        return [sql_enum.enum_name.snake for parsed in self.parsed_files.values() for sql_enum in parsed.enums]
+
+    @property
+    def foreign_key_graph(self) -> ForeignKeyGraph:
+        # which tables reference which, e.g. result.foreign_key_graph.dependents("countries")
+        return ForeignKeyGraph.from_parsed_files(self.parsed_files.values())
+
+    @property
+    def written_files(self) -> List[str]:
+        return self.stats.written_files
+
+    @property
+    def unchanged_files(self) -> List[str]:
+        return self.stats.unchanged_files
+
+    @property
+    def removed_files(self) -> List[str]:
+        return self.stats.removed_files
+
+
+def generate(
+    project_root: str,
+    *,
+    targets: Sequence[str] = TARGETS,
+    tables: Collection[str] | None = None,
+    force: bool = False,
+    use_cache: bool = True,
+    jobs: int = 1,
+    sink: OutputSink | None = None,
+) -> GenerationResult:
+    # Generate the files of the Flutter project at project_root from lib/sqls.
+    # targets is any of "models", "providers", "views" and "enums", tables
+    # limits the tables (by name) that are generated. sink receives the files
+    # (see src/output.py), by default they are written under lib/. Safe to call
+    # repeatedly from one process.
+    unknown_targets = set(targets) - set(TARGETS)
+    if unknown_targets:
+        raise ValueError(f"Unknown targets: {', '.join(sorted(unknown_targets))}, expected any of {', '.join(TARGETS)}")
+
+    if not os.path.exists(project_root):
+        raise FileNotFoundError(f"Directory not found: {project_root}")
+
+    # if in the dir does not find a folder called "lib", and no pub.yaml / pub.yml file then it is not a flutter project, raise an error
+    if not os.path.exists(os.path.join(project_root, "lib")):
+        raise FileNotFoundError(
+            f"Directory does not contain a 'lib' folder: {project_root}, maybe it is not a Flutter project."
+        )
+
+    project_name = extract_last_folder_name(project_root)
+
+    lib_directory = os.path.join(project_root, "lib")
+    sqls_directory = os.path.join(lib_directory, "sqls")
+
+    if not os.path.exists(sqls_directory):
+        raise FileNotFoundError(
+            f"Directory not found: {sqls_directory}, please create a 'sqls' folder under 'lib' and add your SQL files."
+        )
+
+    if sink is None:
+        sink = FileSystemSink(lib_directory)
+    # A dry run or an archive renders everything and leaves lib/ untouched,
+    # the manifest and caches included
+    writes_project = sink.writes_project
+    if not writes_project:
+        force = True
+
+    for target in targets if writes_project else ():
+        directory = os.path.join(lib_directory, TARGET_FOLDERS[target])
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+            log(f"Created directory: {directory}")
+        else:
+            log(f"Directory already exists: {directory}")
+
+    # Templates in <project>/sfrf_templates replace the built in ones in src/templates
+    with PROFILER.phase("templates"):
+        TEMPLATES.configure(
+            os.path.join(project_root, TEMPLATE_OVERRIDES_FOLDER),
+            os.path.join(project_cache_directory(lib_directory), TEMPLATE_CACHE_FILE_NAME),
+        )
+
+    # Only regenerate tables and enums whose parsed IR changed since the last run
+    manifest_path = os.path.join(lib_directory, MANIFEST_FILE_NAME)
+    with PROFILER.phase("manifest"):
+        manifest = Manifest.load(manifest_path, settings_fingerprint(project_name), force=force)
+
+    schema_cache: SchemaCache | None = None
+    if use_cache:
+        with PROFILER.phase("cache"):
+            schema_cache = SchemaCache.load(
+                os.path.join(project_cache_directory(lib_directory), SCHEMA_CACHE_FILE_NAME)
+            )
+
+    # Parse every file first, rendering happens afterwards in one batch
+    parsed_files: Dict[str, ParsedSqlFile] = {}
+    for file_path in list_sql_files(sqls_directory):
+        # Unchanged files are loaded from the schema cache instead of being parsed
+        with PROFILER.phase("cache"):
+            parsed = schema_cache.get(file_path) if schema_cache else None
+        if parsed is None:
+            parsed = parse_sql_file_tables(file_path)
+            if schema_cache:
+                schema_cache.put(file_path, parsed)
+        parsed_files[file_path] = parsed
+
+    if tables is not None:
+        parsed_table_names = {
+            table_columns[0].table_name.snake for parsed in parsed_files.values() for table_columns in parsed.tables
+        }
+        unknown_tables = set(tables) - parsed_table_names
+        if unknown_tables:
+            raise ValueError(f"Unknown tables: {', '.join(sorted(unknown_tables))}")
+
+    stats = generate_files(
+        lib_directory,
+        project_name,
+        list(parsed_files.values()),
+        manifest,
+        jobs=jobs,
+        targets=targets,
+        tables=tables,
+        sink=sink,
+    )
+
+    if not writes_project:
+        return GenerationResult(project_name, lib_directory, stats, parsed_files, manifest, schema_cache)
+
+    with PROFILER.phase("manifest"):
+        manifest.save()
+    if schema_cache:
+        with PROFILER.phase("cache"):
+            schema_cache.save()
+    with PROFILER.phase("templates"):
+        TEMPLATES.save_cache()
+
+    return GenerationResult(project_name, lib_directory, stats, parsed_files, manifest, schema_cache)
@@ -1,14 +1,33 @@
-
-
-
-from typing import List
+import weakref
+from typing import Dict, List, Tuple
 
 
 class NameVariant:
+    # snake / camel / CapCamel forms of one SQL name. Get instances through
+    # get_name_variant so every occurrence of a name shares one object; camel
+    # and cap_camel are only computed the first time an emitter reads them.
+    __slots__ = ("snake", "_camel", "_cap_camel", "__weakref__")
+
     def __init__(self, snake_name: str):
         self.snake: str = snake_name
-        self.camel: str = self.snake_to_camel(snake_name)
-        self.cap_camel: str = self.capitalize_camel_case(self.camel)
+        self._camel: str | None = None
+        self._cap_camel: str | None = None
+
+    @property
+    def camel(self) -> str:
+        if self._camel is None:
+            self._camel = self.snake_to_camel(self.snake)
+        return self._camel
+
+    @property
+    def cap_camel(self) -> str:
+        if self._cap_camel is None:
+            self._cap_camel = self.capitalize_camel_case(self.camel)
+        return self._cap_camel
+
+    def __reduce__(self):
+        # unpickled variants (schema cache, --jobs workers) are interned again
+        return (get_name_variant, (self.snake,))
 
     @staticmethod
     def snake_to_camel(snake_str: str) -> str:
@@ -24,7 +43,32 @@ class NameVariant:
         return camel_str[0].upper() + camel_str[1:]
 
 
+# Weak, so the names of dropped tables and columns don't pile up in a
+# long --watch session: a variant lives as long as a parsed schema uses it
+_NAME_VARIANTS: "weakref.WeakValueDictionary[str, NameVariant]" = weakref.WeakValueDictionary()
+
+
+def get_name_variant(snake_name: str) -> NameVariant:
+    name_variant = _NAME_VARIANTS.get(snake_name)
+    if name_variant is None:
+        name_variant = _NAME_VARIANTS[snake_name] = NameVariant(snake_name)
+    return name_variant
+
+
 class Column:
+    __slots__ = (
+        "table_name",
+        "column_name",
+        "sql_type",
+        "dart_type",
+        "related_table_name",
+        "is_not_null",
+        "is_primary_key",
+        "is_foreign_key",
+        "is_enum",
+        "sql_enum",
+    )
+
     def __init__(
         self,
         table_name: str,
@@ -36,23 +80,130 @@ class Column:
         is_primary_key: bool = False,
         is_foreign_key: bool = False,
         is_enum: bool = False,
+        sql_enum: "SqlEnum | None" = None,
     ):
-        self.table_name: NameVariant = NameVariant(table_name)
-        self.column_name: NameVariant = NameVariant(column_name)
+        self.table_name: NameVariant = get_name_variant(table_name)
+        self.column_name: NameVariant = get_name_variant(column_name)
         self.sql_type = sql_type
         self.dart_type = dart_type
-        self.related_table_name: NameVariant = (
-            NameVariant(related_table_name)
-        )
+        self.related_table_name: NameVariant = get_name_variant(related_table_name)
         self.is_not_null = is_not_null
         self.is_primary_key = is_primary_key
         self.is_foreign_key = is_foreign_key
         self.is_enum = is_enum
+        # resolved once while parsing, emitters read it instead of searching the enum list
+        self.sql_enum: SqlEnum | None = sql_enum
 
 
 class SqlEnum:
+    __slots__ = ("enum_name", "enum_values")
+
     def __init__(self, enum_name: str, enum_values: List[str]):
-        self.enum_name: NameVariant = NameVariant(enum_name)
+        self.enum_name: NameVariant = get_name_variant(enum_name)
         self.enum_values: List[str] = enum_values
 
-    
\ No newline at end of file
+
+class EnumRegistry:
+    # SqlEnums keyed by snake name, built once per schema
+    __slots__ = ("enums", "_by_snake_name")
+
+    def __init__(self, enums: List[SqlEnum]):
+        self.enums: List[SqlEnum] = enums
+        self._by_snake_name: Dict[str, SqlEnum] = {}
+        for enum in enums:
+            # the first definition wins
+            self._by_snake_name.setdefault(enum.enum_name.snake, enum)
+
+    def get(self, snake_enum_name: str) -> SqlEnum | None:
+        return self._by_snake_name.get(snake_enum_name)
+
+    def __contains__(self, snake_enum_name: str) -> bool:
+        return snake_enum_name in self._by_snake_name
+
+    def __iter__(self):
+        return iter(self.enums)
+
+    def __len__(self) -> int:
+        return len(self.enums)
+
+
+# Schema IR built by src/sql_parser.py in a single pass over the SQL file
+
+
+class SqlColumnDef:
+    # mutable: table constraints and ALTER TABLE ... PRIMARY KEY are applied after the column is parsed
+    __slots__ = ("column_name", "sql_type", "related_table_name", "is_not_null", "is_primary_key")
+
+    def __init__(
+        self,
+        column_name: str,
+        sql_type: str,
+        related_table_name: str = "",
+        is_not_null: bool = False,
+        is_primary_key: bool = False,
+    ):
+        self.column_name = column_name
+        self.sql_type = sql_type
+        self.related_table_name = related_table_name
+        self.is_not_null = is_not_null
+        self.is_primary_key = is_primary_key
+
+
+class SqlTableDef:
+    __slots__ = ("table_name", "columns")
+
+    def __init__(self, table_name: str, columns: List[SqlColumnDef]):
+        self.table_name = table_name
+        self.columns = columns
+
+
+class SqlEnumDef:
+    __slots__ = ("enum_name", "enum_values")
+
+    def __init__(self, enum_name: str, enum_values: List[str]):
+        self.enum_name = enum_name
+        self.enum_values = enum_values
+
+
+class SqlForeignKeyDef:
+    # ALTER TABLE "entries" ADD FOREIGN KEY ("item_id") REFERENCES "items" ("id");
+    __slots__ = ("table_name", "column_name", "related_table_name")
+
+    def __init__(self, table_name: str, column_name: str, related_table_name: str):
+        self.table_name = table_name
+        self.column_name = column_name
+        self.related_table_name = related_table_name
+
+
+class SqlSchema:
+    __slots__ = ("tables", "tables_by_name", "enums", "foreign_keys", "foreign_key_index")
+
+    def __init__(self):
+        self.tables: List[SqlTableDef] = []
+        self.tables_by_name: Dict[str, SqlTableDef] = {}
+        self.enums: List[SqlEnumDef] = []
+        self.foreign_keys: List[SqlForeignKeyDef] = []
+        # (table name, column name) -> related table name, built once while parsing
+        self.foreign_key_index: Dict[Tuple[str, str], str] = {}
+
+    def add_table(self, table: "SqlTableDef"):
+        self.tables.append(table)
+        self.tables_by_name.setdefault(table.table_name, table)
+
+    def add_foreign_key(self, foreign_key: "SqlForeignKeyDef"):
+        self.foreign_keys.append(foreign_key)
+        # the first ALTER TABLE for a column wins
+        self.foreign_key_index.setdefault(
+            (foreign_key.table_name, foreign_key.column_name),
+            foreign_key.related_table_name,
+        )
+
+
+class ParsedSqlFile:
+    # Everything the generator needs from one SQL file, see src/schema_cache.py
+    __slots__ = ("schema", "enums", "tables")
+
+    def __init__(self, schema: SqlSchema, enums: List[SqlEnum], tables: List[List[Column]]):
+        self.schema = schema
+        self.enums = enums
+        self.tables = tables
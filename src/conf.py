@@ -1,3 +1,51 @@
 DEBUG_PRINT_IN_PROVIDER:bool = True
 
-MODEL_HAS_DEFAULT_VALUE:bool = True
\ No newline at end of file
+MODEL_HAS_DEFAULT_VALUE:bool = True
+
+# Columns the list query of a table selects, by table name. Tables not listed
+# select every column. Primary key and not null columns can't be left out,
+# the Model needs them.
+# e.g. {"cities": ["id", "name", "population", "country_id"]}
+QUERY_COLUMNS:dict[str, list[str]] = {}
+
+# Columns selected from an embedded related table, by "<table>.<foreign key
+# column>" for one relation or by related table name for every relation to
+# it. The default is the related table's primary key, its not null columns
+# and its label column (name, title, label or the first text column).
+# e.g. {"entries.city_id": ["id", "name", "population"], "countries": ["id", "name"]}
+EMBED_COLUMNS:dict[str, list[str]] = {}
+
+# How deep the query of a table embeds related rows, by "<table>.<foreign key
+# column>" for one relation or by table name for all of its relations. 0 (or
+# False) leaves the relation out of the query and out of the Model, 1 (the
+# default) embeds the related row, 2 also embeds the rows it embeds itself,
+# and so on.
+# e.g. {"entries.city_id": 2, "entries.category_id": 0, "logs": 0}
+EMBED_DEPTH:dict[str, int] = {}
+
+# Generation prints a warning for a query that embeds more related rows per
+# row than this, nested embeds included
+MAX_EMBED_FAN_OUT:int = 8
+
+# Tables whose provider loads PAGE_SIZE rows at a time with keyset pagination
+# and exposes loadMore(), by table name, mapped to the not null column rows
+# are ordered by ("" orders by the primary key). Their views load the next
+# page when the list is scrolled near its end.
+# e.g. {"entries": "", "cities": "established_date"}
+PAGINATED_TABLES:dict[str, str] = {}
+
+PAGE_SIZE:int = 50
+
+# Tables whose provider follows Supabase realtime changes and patches the
+# loaded rows by primary key, applying a burst of changes at most once per
+# REALTIME_INTERVAL_MILLISECONDS. Realtime has to be enabled for the table.
+# e.g. ["entries"]
+REALTIME_TABLES:list[str] = []
+
+REALTIME_INTERVAL_MILLISECONDS:int = 100
+
+# The column foreign key dropdowns show for a row of a table, by table name.
+# The default is name, title or label, else the first text column, else the
+# primary key. Also embedded by default, see EMBED_COLUMNS.
+# e.g. {"cities": "description"}
+LABEL_COLUMNS:dict[str, str] = {}
@@ -0,0 +1,158 @@
+from typing import Dict, Iterable, List, Set
+
+from src.classes import Column, ParsedSqlFile
+
+
+class ForeignKeyGraph:
+    # Directed graph of the tables of a schema with an edge from every table to
+    # each table its foreign keys reference. The model, provider and view of a
+    # table embed the tables it references, so its artifacts depend on them.
+    # References to tables outside the schema (auth.users) are not edges.
+    # Self referencing tables and longer cycles are allowed, see cycles().
+    def __init__(self, tables: Iterable[List[Column]]):
+        table_list = [table_columns for table_columns in tables if table_columns]
+        # in schema order, a table defined twice keeps its first position
+        self.tables: List[str] = list(dict.fromkeys(table_columns[0].table_name.snake for table_columns in table_list))
+        known_tables = set(self.tables)
+        self._references: Dict[str, List[str]] = {table: [] for table in self.tables}
+        self._referenced_by: Dict[str, List[str]] = {table: [] for table in self.tables}
+        for table_columns in table_list:
+            table = table_columns[0].table_name.snake
+            for column in table_columns:
+                related_table = column.related_table_name.snake
+                if related_table in known_tables and related_table not in self._references[table]:
+                    self._references[table].append(related_table)
+                    self._referenced_by[related_table].append(table)
+        self._components: List[List[str]] | None = None
+        self._component_index: Dict[str, int] = {}
+
+    @classmethod
+    def from_parsed_files(cls, parsed_files: Iterable[ParsedSqlFile]) -> "ForeignKeyGraph":
+        return cls(table_columns for parsed in parsed_files for table_columns in parsed.tables)
+
+    def __contains__(self, table: str) -> bool:
+        return table in self._references
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def references(self, table: str) -> List[str]:
+        # tables that table's foreign keys point at, in column order
+        return list(self._references[table])
+
+    def referenced_by(self, table: str) -> List[str]:
+        return list(self._referenced_by[table])
+
+    def dependencies(self, table: str) -> Set[str]:
+        # every table that table reaches through foreign keys, itself only
+        # when it is part of a cycle
+        return self._reach(self._references, [table])
+
+    def dependents(self, table: str) -> Set[str]:
+        # every table whose artifacts embed table, directly or through others
+        return self._reach(self._referenced_by, [table])
+
+    def affected_by(self, changed_tables: Iterable[str], max_distance: int | None = None) -> Set[str]:
+        # the tables to regenerate when changed_tables change, max_distance
+        # limits them to the tables at most that many foreign keys away
+        changed = [table for table in changed_tables if table in self._references]
+        if max_distance is None:
+            return set(changed) | self._reach(self._referenced_by, changed)
+        affected = set(changed)
+        frontier = changed
+        for _ in range(max_distance):
+            next_frontier: List[str] = []
+            for table in frontier:
+                for referencing_table in self._referenced_by[table]:
+                    if referencing_table not in affected:
+                        affected.add(referencing_table)
+                        next_frontier.append(referencing_table)
+            frontier = next_frontier
+        return affected
+
+    def is_self_referencing(self, table: str) -> bool:
+        return table in self._references[table]
+
+    def cycles(self) -> List[List[str]]:
+        # groups of tables that reference each other, including single self
+        # referencing tables, each in schema order
+        return [
+            component
+            for component in self.components()
+            if len(component) > 1 or self.is_self_referencing(component[0])
+        ]
+
+    def components(self) -> List[List[str]]:
+        # strongly connected components, every component after all the
+        # components it references (dependencies first)
+        if self._components is None:
+            self._components = self._strongly_connected_components()
+            for index, component in enumerate(self._components):
+                for table in component:
+                    self._component_index[table] = index
+        return self._components
+
+    def component_index(self, table: str) -> int:
+        if self._components is None:
+            self.components()
+        return self._component_index[table]
+
+    def topological_order(self) -> List[str]:
+        # every table after the tables it references, tables of a cycle next
+        # to each other
+        return [table for component in self.components() for table in component]
+
+    @staticmethod
+    def _reach(edges: Dict[str, List[str]], start_tables: List[str]) -> Set[str]:
+        reached: Set[str] = set()
+        stack = [next_table for table in start_tables for next_table in edges[table]]
+        while stack:
+            table = stack.pop()
+            if table not in reached:
+                reached.add(table)
+                stack.extend(edges[table])
+        return reached
+
+    def _strongly_connected_components(self) -> List[List[str]]:
+        # Tarjan's algorithm without recursion, long foreign key chains would
+        # hit the recursion limit. Components come out dependencies first.
+        order = {table: position for position, table in enumerate(self.tables)}
+        index: Dict[str, int] = {}
+        low_link: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+
+        for root in self.tables:
+            if root in index:
+                continue
+            index[root] = low_link[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self._references[root]))]
+            while work:
+                table, references = work[-1]
+                for related_table in references:
+                    if related_table not in index:
+                        index[related_table] = low_link[related_table] = len(index)
+                        stack.append(related_table)
+                        on_stack.add(related_table)
+                        work.append((related_table, iter(self._references[related_table])))
+                        break
+                    if related_table in on_stack:
+                        low_link[table] = min(low_link[table], index[related_table])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low_link[parent] = min(low_link[parent], low_link[table])
+                    if low_link[table] == index[table]:
+                        component: List[str] = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == table:
+                                break
+                        components.append(sorted(component, key=order.__getitem__))
+        return components
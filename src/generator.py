@@ -0,0 +1,277 @@
+import os
+from typing import Collection, Dict, List, Sequence, Set, Tuple
+
+from src.classes import Column, ParsedSqlFile, SqlEnum
+from src.conf import MAX_EMBED_FAN_OUT, REALTIME_TABLES
+from src.profiling import PROFILER
+from src.dependency_graph import ForeignKeyGraph
+from src.manifest import (
+    Manifest,
+    dependency_fingerprint,
+    enum_fingerprint,
+    table_fingerprint,
+    table_own_fingerprint,
+    table_structure_fingerprint,
+)
+from src.output import FileSystemSink, OutputSink
+from src.projection import max_embed_depth, primary_key_column
+from src.targets import TARGET_FOLDERS, TARGETS, Artifact
+from src.utils import warn
+
+
+class GenerationStats:
+    def __init__(self):
+        # tables / enums rendered vs. skipped because their fingerprint did not change
+        self.regenerated_count = 0
+        self.unchanged_count = 0
+        # files written vs. left as they are: identical to what is on disk, or
+        # of a group that was kept or left out of the run
+        self.written_file_count = 0
+        self.unchanged_file_count = 0
+        self.written_files: List[str] = []
+        self.unchanged_files: List[str] = []
+        # stale files of dropped tables and enums
+        self.removed_files: List[str] = []
+
+
+def list_sql_files(sqls_directory: str) -> List[str]:
+    # Skip hidden files and editor backups (.schema.sql.swp, schema.sql~)
+    return [
+        os.path.join(sqls_directory, file)
+        for file in sorted(os.listdir(sqls_directory))
+        if not file.startswith(".")
+        and not file.endswith("~")
+        and os.path.isfile(os.path.join(sqls_directory, file))
+    ]
+
+
+def generate_files(
+    lib_directory: str,
+    project_name: str,
+    parsed_files: List[ParsedSqlFile],
+    manifest: Manifest,
+    jobs: int = 1,
+    rendered_contents: Dict[str, str] | None = None,
+    targets: Sequence[str] = TARGETS,
+    tables: Collection[str] | None = None,
+    sink: OutputSink | None = None,
+    touched_tables: Collection[str] | None = None,
+) -> GenerationStats:
+    # Render and write every table and enum of parsed_files whose fingerprint
+    # is not in the manifest yet. rendered_contents (output file -> content)
+    # lets a long running process skip reading back files it wrote itself.
+    # targets limits the kinds of files, tables the tables (by snake name);
+    # whatever is left out keeps its manifest entry for the next full run.
+    # sink receives the files, by default they are written under lib/.
+    # touched_tables are the only tables that can have changed since the
+    # manifest was recorded, as --watch knows them. The tables neither they
+    # nor their changes affect are kept without a look at their files.
+    stats = GenerationStats()
+    table_targets = [target for target in TARGETS if target in targets and target != "enums"]
+
+    # (manifest key, fingerprint, input) of everything that has to be rendered
+    table_jobs: List[Tuple[str, str, List[Column]]] = []
+    enum_jobs: List[Tuple[str, str, SqlEnum]] = []
+
+    # A table's files embed columns of the tables it references, so a change
+    # to a table also regenerates the tables embedding it
+    tables_by_name: Dict[str, List[Column]] = {
+        table_columns[0].table_name.snake: table_columns for parsed in parsed_files for table_columns in parsed.tables
+    }
+    with PROFILER.phase("fingerprint"):
+        graph = ForeignKeyGraph.from_parsed_files(parsed_files)
+        candidate_tables = tables_by_name.keys() if touched_tables is None else tables_by_name.keys() & touched_tables
+        own_fingerprints = {
+            f"table:{snake_table_name}": table_own_fingerprint(
+                table_structure_fingerprint(tables_by_name[snake_table_name]),
+                table_targets,
+                bool(graph.referenced_by(snake_table_name)),
+            )
+            for snake_table_name in candidate_tables
+        }
+        changed_tables = {
+            manifest_key.split(":", 1)[1]
+            for manifest_key, own_fingerprint in own_fingerprints.items()
+            if not manifest.own_fingerprint_matches(manifest_key, own_fingerprint)
+        }
+        # a dropped table is no node of the graph, the tables that referenced it embed it no longer
+        previous_tables = manifest.previous_tables()
+        if touched_tables is not None:
+            previous_tables = [table for table in previous_tables if table in touched_tables]
+        dropped_tables = set(previous_tables) - tables_by_name.keys()
+        if dropped_tables:
+            changed_tables.update(
+                snake_table_name
+                for snake_table_name, table_columns in tables_by_name.items()
+                if any(column.related_table_name.snake in dropped_tables for column in table_columns)
+            )
+        # Only these can have a new fingerprint, the others are kept as they are
+        affected_tables = graph.affected_by(changed_tables, max_embed_depth())
+
+    for parsed in parsed_files:
+        for table_columns in parsed.tables:
+            snake_table_name = table_columns[0].table_name.snake
+            manifest_key = f"table:{snake_table_name}"
+            skipped = not table_targets or (tables is not None and snake_table_name not in tables)
+            if snake_table_name not in affected_tables:
+                # neither the table nor a table it embeds changed
+                if skipped:
+                    manifest.carry_over(manifest_key)
+                    continue
+                if manifest_key in manifest.previous_artifacts and (
+                    touched_tables is not None or manifest.files_exist(manifest_key)
+                ):
+                    manifest.keep(manifest_key)
+                    stats.unchanged_count += 1
+                    continue
+            with PROFILER.phase("fingerprint"):
+                if manifest_key not in own_fingerprints:
+                    own_fingerprints[manifest_key] = table_own_fingerprint(
+                        table_structure_fingerprint(table_columns),
+                        table_targets,
+                        bool(graph.referenced_by(snake_table_name)),
+                    )
+                # which of the affected tables really changed, e.g. a new nullable
+                # column of a related table isn't embedded
+                dependency, fan_out = dependency_fingerprint(table_columns, tables_by_name)
+                fingerprint = table_fingerprint(own_fingerprints[manifest_key], dependency)
+            up_to_date = manifest.is_up_to_date(manifest_key, fingerprint)
+            if skipped:
+                manifest.carry_over(manifest_key, outdated=not up_to_date)
+                continue
+            if up_to_date:
+                manifest.keep(manifest_key)
+                stats.unchanged_count += 1
+                continue
+            # only for the tables rendered in this run, unchanged ones were warned about when they were
+            if graph.referenced_by(snake_table_name) and primary_key_column(table_columns) is None:
+                warn(
+                    f"{snake_table_name} is referenced by a foreign key but has no primary key, "
+                    f"dropdowns for it load every {snake_table_name} row instead of a lookup"
+                )
+            if fan_out > MAX_EMBED_FAN_OUT:
+                warn(
+                    f"the {snake_table_name} query embeds {fan_out} related rows per row, more than "
+                    f"MAX_EMBED_FAN_OUT ({MAX_EMBED_FAN_OUT}). Lower EMBED_DEPTH for {snake_table_name} or turn embeds off."
+                )
+            table_jobs.append((manifest_key, fingerprint, table_columns))
+
+        for sql_enum in parsed.enums:
+            manifest_key = f"enum:{sql_enum.enum_name.snake}"
+            if "enums" not in targets:
+                manifest.carry_over(manifest_key)
+                continue
+            fingerprint = enum_fingerprint(sql_enum)
+            if manifest.is_up_to_date(manifest_key, fingerprint):
+                manifest.keep(manifest_key)
+                stats.unchanged_count += 1
+            else:
+                enum_jobs.append((manifest_key, fingerprint, sql_enum))
+
+    # Dart helpers shared by generated providers. Their content only depends
+    # on the templates, which the manifest settings already cover.
+    support_jobs: List[str] = []
+    if any(snake_table_name in REALTIME_TABLES for snake_table_name in tables_by_name):
+        manifest_key = "support:realtime_rows"
+        if "providers" not in targets:
+            manifest.carry_over(manifest_key)
+        elif manifest.is_up_to_date(manifest_key, manifest_key):
+            manifest.keep(manifest_key)
+        else:
+            support_jobs.append(manifest_key)
+
+    # Nothing is recorded before the writes, so these are the groups kept or
+    # carried over as they are. Their files count as unchanged.
+    for artifact in manifest.artifacts.values():
+        for file_path in artifact["files"]:
+            stats.unchanged_file_count += 1
+            stats.unchanged_files.append(os.path.join(lib_directory, file_path))
+
+    run_folders = {TARGET_FOLDERS[target] for target in targets}
+    output = sink if sink is not None else FileSystemSink(lib_directory)
+    try:
+        if table_jobs or enum_jobs or support_jobs:
+            _write_artifacts(
+                lib_directory, table_jobs, enum_jobs, support_jobs, project_name, manifest, jobs, rendered_contents,
+                table_targets, tables_by_name, own_fingerprints, run_folders, output, stats,
+            )
+        # Files of dropped tables and enums go away in the same commit
+        for stale_file in manifest.stale_files(run_folders):
+            output.remove(stale_file)
+            stats.removed_files.append(os.path.join(lib_directory, stale_file))
+        with PROFILER.phase("write"):
+            output.commit()
+    except BaseException:
+        # e.g. Ctrl-C while rendering, nothing of this run is kept
+        output.abort()
+        raise
+    return stats
+
+
+def _write_artifacts(
+    lib_directory: str,
+    table_jobs: List[Tuple[str, str, List[Column]]],
+    enum_jobs: List[Tuple[str, str, SqlEnum]],
+    support_jobs: List[str],
+    project_name: str,
+    manifest: Manifest,
+    jobs: int,
+    rendered_contents: Dict[str, str] | None,
+    table_targets: List[str],
+    tables_by_name: Dict[str, List[Column]],
+    own_fingerprints: Dict[str, str],
+    run_folders: Set[str],
+    output: OutputSink,
+    stats: GenerationStats,
+):
+    # the emitters and templates are only imported when something has to be rendered
+    from src.render import render_all, render_support_artifacts
+
+    table_artifacts, enum_artifacts = render_all(
+        [table_columns for _, _, table_columns in table_jobs],
+        [sql_enum for _, _, sql_enum in enum_jobs],
+        project_name,
+        jobs=jobs,
+        targets=table_targets,
+        tables_by_name=tables_by_name,
+    )
+
+    # The sink compares rendered files with what it has and only takes the changed ones
+    jobs_with_artifacts: List[Tuple[str, str, List[Artifact]]] = [
+        (manifest_key, fingerprint, artifacts)
+        for (manifest_key, fingerprint, _), artifacts in zip(table_jobs + enum_jobs, table_artifacts + enum_artifacts)
+    ]
+    jobs_with_artifacts.extend(
+        (manifest_key, manifest_key, artifacts)
+        for manifest_key, artifacts in render_support_artifacts("support:realtime_rows" in support_jobs)
+    )
+    for manifest_key, fingerprint, artifacts in jobs_with_artifacts:
+        output_files: List[str] = []
+        for relative_path, content in artifacts:
+            output_file = os.path.join(lib_directory, relative_path)
+            output_files.append(output_file)
+            PROFILER.record_artifact(relative_path, content)
+            if rendered_contents is not None and rendered_contents.get(output_file) == content:
+                stats.unchanged_file_count += 1
+                stats.unchanged_files.append(output_file)
+                continue
+            with PROFILER.phase("write", manifest_key.split(":", 1)[1] if manifest_key.startswith("table:") else ""):
+                written = output.write(relative_path, content)
+            if written:
+                stats.written_file_count += 1
+                stats.written_files.append(output_file)
+            else:
+                stats.unchanged_file_count += 1
+                stats.unchanged_files.append(output_file)
+            if rendered_contents is not None:
+                rendered_contents[output_file] = content
+        # a partial run (--targets) still owns the files in the other folders
+        for file_path in manifest.previous_files.get(manifest_key, []):
+            if os.path.dirname(file_path) not in run_folders:
+                output_file = os.path.join(lib_directory, file_path)
+                output_files.append(output_file)
+                stats.unchanged_file_count += 1
+                stats.unchanged_files.append(output_file)
+        manifest.record(manifest_key, fingerprint, output_files, own_fingerprints.get(manifest_key, ""))
+        if not manifest_key.startswith("support:"):
+            stats.regenerated_count += 1
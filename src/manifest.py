@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+from typing import Any, Collection, Dict, List, Sequence, Tuple
+
+from src import conf
+from src.classes import Column, SqlEnum
+from src.projection import dropdown_label, embedded_selects, related_tables_of
+from src.templating import TEMPLATES
+from src.utils import write_to_file
+
+
+def _source_fingerprint() -> str:
+    # every generator source and template, so any change to the generator
+    # (an upgrade or a local edit) invalidates the manifest and schema cache
+    source_directory = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for directory, directory_names, file_names in os.walk(source_directory):
+        directory_names[:] = sorted(name for name in directory_names if name != "__pycache__")
+        for file_name in sorted(file_names):
+            if not file_name.endswith((".py", ".tmpl")):
+                continue
+            path = os.path.join(directory, file_name)
+            digest.update(os.path.relpath(path, source_directory).replace(os.sep, "/").encode("utf-8") + b"\0")
+            with open(path, "rb") as f:
+                digest.update(f.read() + b"\0")
+    return digest.hexdigest()[:16]
+
+
+GENERATOR_VERSION = _source_fingerprint()
+
+MANIFEST_FILE_NAME = ".sfrf_manifest.json"
+
+
+def _hash(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _combine(fingerprints: Sequence[str]) -> str:
+    # hash of hashes, without the JSON round trip of _hash()
+    return hashlib.sha256("\0".join(fingerprints).encode("ascii")).hexdigest()
+
+
+def settings_fingerprint(project_name: str) -> str:
+    # Generated files embed the project name and depend on every src/conf.py
+    # setting and template, see src/templating.py
+    settings = {name: value for name, value in vars(conf).items() if name.isupper()}
+    return _hash(
+        {
+            "generator_version": GENERATOR_VERSION,
+            "project_name": project_name,
+            "settings": json.loads(json.dumps(settings, default=repr)),
+            "templates": TEMPLATES.fingerprint(),
+        }
+    )
+
+
+def table_structure_fingerprint(table_columns: List[Column]) -> str:
+    # the parsed IR of one table
+    return _hash(
+        [
+            [
+                column.table_name.snake,
+                column.column_name.snake,
+                column.sql_type,
+                column.dart_type,
+                column.related_table_name.snake,
+                column.is_not_null,
+                column.is_primary_key,
+                column.is_foreign_key,
+                column.is_enum,
+                column.sql_enum.enum_name.snake if column.sql_enum else "",
+            ]
+            for column in table_columns
+        ]
+    )
+
+
+def dependency_fingerprint(table_columns: List[Column], tables_by_name: Dict[str, List[Column]]) -> Tuple[str, int]:
+    # What the artifacts of a table read from other tables: the columns its
+    # query embeds from them, nested up to EMBED_DEPTH, and what its foreign
+    # key dropdowns show. A change to a related table only regenerates the
+    # tables whose embeds or dropdowns it changes.
+    # Also returns the embed fan out of the query, see MAX_EMBED_FAN_OUT
+    related_tables = related_tables_of(table_columns, tables_by_name)
+    dropdowns = [
+        dropdown_label(related_tables.get(column.related_table_name.snake))
+        for column in table_columns
+        if column.related_table_name.snake
+    ]
+    embedded, fan_out = embedded_selects(table_columns, related_tables)
+    return _combine(embedded + dropdowns), fan_out
+
+
+def table_own_fingerprint(structure_fingerprint: str, targets: Sequence[str], referenced: bool = False) -> str:
+    # What the artifacts of a table read from the table itself. targets
+    # (models, providers, views) are part of it, so a partial run doesn't mark
+    # the files it skipped as up to date. A referenced table's provider has a
+    # lookup provider too. When it didn't change for any table the table
+    # references, directly or not, the dependency fingerprint didn't either.
+    return _combine([*targets, structure_fingerprint, "referenced" if referenced else ""])
+
+
+def table_fingerprint(own_fingerprint: str, dependency_fingerprint: str) -> str:
+    return _combine([own_fingerprint, dependency_fingerprint])
+
+
+def enum_fingerprint(sql_enum: SqlEnum) -> str:
+    return _hash([sql_enum.enum_name.snake, sql_enum.enum_values])
+
+
+class Manifest:
+    # lib/.sfrf_manifest.json, maps every artifact group ("table:<name>" or
+    # "enum:<name>") to the fingerprint of its parsed IR and the files it wrote
+    def __init__(self, manifest_path: str, settings: str):
+        self.manifest_path = manifest_path
+        # file paths are stored relative to lib/
+        self.lib_directory = os.path.dirname(manifest_path)
+        self.settings = settings
+        self.artifacts: Dict[str, Dict[str, Any]] = {}
+        self.previous_artifacts: Dict[str, Dict[str, Any]] = {}
+        # files of the last run per group, even when its fingerprints can't be
+        # reused, so files of dropped tables and enums can be cleaned up
+        self.previous_files: Dict[str, List[str]] = {}
+
+    @classmethod
+    def load(cls, manifest_path: str, settings: str, force: bool = False) -> "Manifest":
+        manifest = cls(manifest_path, settings)
+        if not os.path.exists(manifest_path):
+            return manifest
+        try:
+            with open(manifest_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            print(f">> Ignoring unreadable manifest: {manifest_path}")
+            return manifest
+
+        artifacts: Dict[str, Dict[str, Any]] = data.get("artifacts", {})
+        manifest.previous_files = {key: artifact.get("files", []) for key, artifact in artifacts.items()}
+        # Upgrading the generator or changing src/conf.py invalidates everything, so does --force
+        if not force and data.get("generator_version") == GENERATOR_VERSION and data.get("settings") == settings:
+            manifest.previous_artifacts = artifacts
+        return manifest
+
+    def begin_update(self):
+        # --watch: the artifacts of the last generation become the previous
+        # ones, the next generation records every group it sees again
+        self.previous_artifacts = self.artifacts
+        self.previous_files = {key: artifact["files"] for key, artifact in self.artifacts.items()}
+        self.artifacts = {}
+
+    def abort_update(self):
+        # --watch: the generation failed, back to the state before begin_update()
+        self.artifacts = self.previous_artifacts
+
+    def is_up_to_date(self, key: str, fingerprint: str) -> bool:
+        previous = self.previous_artifacts.get(key)
+        if not previous or previous.get("fingerprint") != fingerprint:
+            return False
+        return self.files_exist(key)
+
+    def files_exist(self, key: str) -> bool:
+        # Regenerate if someone deleted one of the files
+        return all(
+            os.path.exists(os.path.join(self.lib_directory, file_path))
+            for file_path in self.previous_artifacts[key].get("files", [])
+        )
+
+    def own_fingerprint_matches(self, key: str, own_fingerprint: str) -> bool:
+        # see table_own_fingerprint()
+        previous = self.previous_artifacts.get(key)
+        return bool(previous) and previous.get("own_fingerprint") == own_fingerprint
+
+    def previous_tables(self) -> List[str]:
+        return [key.split(":", 1)[1] for key in self.previous_artifacts if key.startswith("table:")]
+
+    def keep(self, key: str):
+        self.artifacts[key] = self.previous_artifacts[key]
+
+    def carry_over(self, key: str, outdated: bool = False):
+        # A group left out of this run (--targets / --tables) keeps its files.
+        # Without a reusable fingerprint the next full run regenerates it, so
+        # does an outdated one, e.g. a table embedding a table of this run.
+        if key in self.previous_artifacts and not outdated:
+            self.keep(key)
+        elif key in self.previous_files:
+            self.artifacts[key] = {"fingerprint": "", "files": self.previous_files[key]}
+
+    def record(self, key: str, fingerprint: str, file_paths: List[str], own_fingerprint: str = ""):
+        # file_paths exist, they were just written or found unchanged
+        self.artifacts[key] = {
+            "fingerprint": fingerprint,
+            "files": sorted(os.path.relpath(file_path, self.lib_directory) for file_path in file_paths),
+        }
+        if own_fingerprint:
+            self.artifacts[key]["own_fingerprint"] = own_fingerprint
+
+    def stale_files(self, folders: Collection[str]) -> List[str]:
+        # Files of the last run that this run didn't produce: everything of a
+        # dropped group, and e.g. the view of a table that lost its id column.
+        # Only files in the given output folders qualify. Paths are relative to lib/.
+        stale: List[str] = []
+        for key, previous_files in self.previous_files.items():
+            current_files = set(self.artifacts[key]["files"]) if key in self.artifacts else set()
+            for file_path in previous_files:
+                if file_path not in current_files and os.path.dirname(file_path) in folders:
+                    stale.append(file_path)
+        return stale
+
+    def save(self):
+        # Groups that were not seen this run (dropped tables / enums) are forgotten
+        write_to_file(
+            self.manifest_path,
+            json.dumps(
+                {
+                    "generator_version": GENERATOR_VERSION,
+                    "settings": self.settings,
+                    "artifacts": self.artifacts,
+                },
+                indent=2,
+                sort_keys=True,
+            ),
+        )
@@ -0,0 +1,222 @@
+import io
+import os
+import shutil
+from typing import BinaryIO, Dict, List, Tuple
+
+from src.utils import log
+
+
+# Changed files are written here first, inside lib/ so the final rename
+# stays on the same file system and is atomic
+STAGING_FOLDER_NAME = ".sfrf_staging"
+
+# no newline translation on Windows
+_O_BINARY = getattr(os, "O_BINARY", 0)
+
+ARCHIVE_FORMATS = ("tar", "zip")
+
+
+def file_has_content(file_path: str, data: bytes) -> bool:
+    # One stat decides most changed files, only same sized files are read
+    # back. os.open / os.read skip the fstat, isatty and seek calls of open().
+    try:
+        if os.stat(file_path).st_size != len(data):
+            return False
+        fd = os.open(file_path, os.O_RDONLY | _O_BINARY)
+    except FileNotFoundError:
+        return False
+    try:
+        return os.read(fd, len(data) + 1) == data
+    finally:
+        os.close(fd)
+
+
+def _write_new_file(file_path: str, data: bytes):
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | _O_BINARY, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+def _encode(content: str) -> bytes:
+    # the same bytes write_to_file writes
+    return content.strip().encode("utf-8")
+
+
+class OutputSink:
+    # Where generate_files puts the rendered files, by path relative to lib/.
+    # write() returns whether the file is new or changed. Nothing is final
+    # until commit(), abort() drops everything since the last commit.
+    # Sinks that don't write the Flutter project get every file rendered and
+    # leave the manifest and caches under lib/ alone.
+    writes_project = False
+
+    def write(self, relative_path: str, content: str) -> bool:
+        raise NotImplementedError
+
+    def remove(self, relative_path: str):
+        raise NotImplementedError
+
+    def commit(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+class FileSystemSink(OutputSink):
+    # Writes the files under lib/. Nothing under lib/ changes until commit():
+    # changed files are written to lib/.sfrf_staging as they come in, then
+    # moved over the old ones with os.replace, and stale files of dropped
+    # tables and enums are removed in the same step. A reader sees every file
+    # either before or after the run, never half written, and an interrupted
+    # run leaves lib/ as it was.
+    writes_project = True
+
+    def __init__(self, lib_directory: str):
+        self.lib_directory = lib_directory
+        self.staging_directory = os.path.join(lib_directory, STAGING_FOLDER_NAME)
+        # (staging path, output path)
+        self.staged: List[Tuple[str, str]] = []
+        self.removed: List[str] = []
+
+    def write(self, relative_path: str, content: str) -> bool:
+        output_file = os.path.join(self.lib_directory, relative_path)
+        data = _encode(content)
+        if file_has_content(output_file, data):
+            return False
+
+        if not self.staged:
+            self._create_staging_directory()
+        # flat numbered names, so staging needs no sub directories
+        staging_path = os.path.join(self.staging_directory, str(len(self.staged)))
+        _write_new_file(staging_path, data)
+        self.staged.append((staging_path, output_file))
+        return True
+
+    def remove(self, relative_path: str):
+        self.removed.append(os.path.join(self.lib_directory, relative_path))
+
+    def _create_staging_directory(self):
+        try:
+            os.mkdir(self.staging_directory)
+        except FileExistsError:
+            # left over from an interrupted run
+            shutil.rmtree(self.staging_directory)
+            os.mkdir(self.staging_directory)
+
+    def commit(self):
+        for staging_path, output_file in self.staged:
+            os.replace(staging_path, output_file)
+            log(f">> Written to {output_file}")
+        for output_file in self.removed:
+            try:
+                os.remove(output_file)
+                log(f">> Removed {output_file}")
+            except FileNotFoundError:
+                pass
+        if self.staged:
+            os.rmdir(self.staging_directory)
+        self.staged = []
+        self.removed = []
+
+    def abort(self):
+        if self.staged:
+            shutil.rmtree(self.staging_directory, ignore_errors=True)
+        self.staged = []
+        self.removed = []
+
+
+class DryRunSink(OutputSink):
+    # --dry-run: compares every file with lib/ but never writes. changed and
+    # removed list what a real run would do.
+    def __init__(self, lib_directory: str):
+        self.lib_directory = lib_directory
+        self.changed: List[str] = []
+        self.removed: List[str] = []
+
+    def write(self, relative_path: str, content: str) -> bool:
+        if file_has_content(os.path.join(self.lib_directory, relative_path), _encode(content)):
+            return False
+        self.changed.append(relative_path)
+        return True
+
+    def remove(self, relative_path: str):
+        if os.path.exists(os.path.join(self.lib_directory, relative_path)):
+            self.removed.append(relative_path)
+
+
+class MemorySink(OutputSink):
+    # Keeps the files in files (relative path -> content), e.g. for golden
+    # tests. Pass the files of an earlier run to only get the changes reported.
+    def __init__(self, files: Dict[str, str] | None = None):
+        self.files: Dict[str, str] = dict(files) if files else {}
+        self._pending: Dict[str, str | None] = {}
+
+    def write(self, relative_path: str, content: str) -> bool:
+        content = content.strip()
+        if self._pending.get(relative_path, self.files.get(relative_path)) == content:
+            return False
+        self._pending[relative_path] = content
+        return True
+
+    def remove(self, relative_path: str):
+        self._pending[relative_path] = None
+
+    def commit(self):
+        for relative_path, content in self._pending.items():
+            if content is None:
+                self.files.pop(relative_path, None)
+            else:
+                self.files[relative_path] = content
+        self._pending = {}
+
+    def abort(self):
+        self._pending = {}
+
+
+class ArchiveSink(OutputSink):
+    # --stdout: every rendered file goes into one tar or zip archive that is
+    # written to stream on commit. Entries have a fixed date, so the same
+    # schema always gives the same bytes.
+    def __init__(self, stream: BinaryIO, archive_format: str = "tar"):
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive format: {archive_format}, expected any of {', '.join(ARCHIVE_FORMATS)}")
+        self.stream = stream
+        self.archive_format = archive_format
+        self._pending: Dict[str, bytes] = {}
+
+    def write(self, relative_path: str, content: str) -> bool:
+        self._pending[relative_path.replace(os.sep, "/")] = _encode(content)
+        return True
+
+    def remove(self, relative_path: str):
+        # an archive only holds what this run rendered
+        pass
+
+    def commit(self):
+        if self.archive_format == "tar":
+            import tarfile
+
+            with tarfile.open(fileobj=self.stream, mode="w|") as archive:
+                for relative_path, data in sorted(self._pending.items()):
+                    info = tarfile.TarInfo(relative_path)
+                    info.size = len(data)
+                    info.mode = 0o644
+                    archive.addfile(info, io.BytesIO(data))
+        else:
+            import zipfile
+
+            with zipfile.ZipFile(self.stream, "w", zipfile.ZIP_DEFLATED) as archive:
+                for relative_path, data in sorted(self._pending.items()):
+                    info = zipfile.ZipInfo(relative_path, date_time=(1980, 1, 1, 0, 0, 0))
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    archive.writestr(info, data)
+        self.stream.flush()
+        self._pending = {}
+
+    def abort(self):
+        self._pending = {}
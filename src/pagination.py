@@ -0,0 +1,37 @@
+from typing import List
+
+from src.classes import Column
+from src.conf import PAGINATED_TABLES
+
+
+class Pagination:
+    # Keyset pagination of one table: rows ordered by order_column, ties
+    # broken by primary_key. Without an order column the primary key orders.
+    __slots__ = ("primary_key", "order_column")
+
+    def __init__(self, primary_key: Column, order_column: Column | None = None):
+        self.primary_key = primary_key
+        self.order_column = order_column
+
+
+def table_pagination(table_columns: List[Column]) -> Pagination | None:
+    # The Pagination of a table listed in PAGINATED_TABLES, None for the others
+    snake_table_name = table_columns[0].table_name.snake
+    order_column_name = PAGINATED_TABLES.get(snake_table_name)
+    if order_column_name is None:
+        return None
+
+    setting = f"PAGINATED_TABLES['{snake_table_name}']"
+    primary_key = next((column for column in table_columns if column.is_primary_key), None)
+    if primary_key is None:
+        raise ValueError(f"{setting}: {snake_table_name} has no primary key to paginate by")
+    if not order_column_name or order_column_name == primary_key.column_name.snake:
+        return Pagination(primary_key)
+
+    order_column = next((column for column in table_columns if column.column_name.snake == order_column_name), None)
+    if order_column is None:
+        raise ValueError(f"{setting} names an unknown column: {order_column_name}")
+    # a null or an enum can't be compared in a keyset filter
+    if not order_column.is_not_null or order_column.is_enum:
+        raise ValueError(f"{setting}: {order_column_name} has to be a not null, non enum column")
+    return Pagination(primary_key, order_column)
@@ -0,0 +1,104 @@
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+class Profiler:
+    # Wall time per phase and per table, output size per artifact and peak
+    # memory. Disabled (and close to free) unless main.py gets --profile.
+    def __init__(self):
+        self.enabled = False
+        self.phase_seconds: Dict[str, float] = defaultdict(float)
+        self.phase_calls: Dict[str, int] = defaultdict(int)
+        self.table_seconds: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.artifact_bytes: Dict[str, int] = {}
+        self.started = 0.0
+
+    def start(self):
+        self.enabled = True
+        self.started = time.perf_counter()
+        # imported here, --profile is the only user
+        import tracemalloc
+
+        tracemalloc.start()
+
+    def phase(self, name: str, table: str = ""):
+        if not self.enabled:
+            return nullcontext()
+        return self._phase(name, table)
+
+    @contextmanager
+    def _phase(self, name: str, table: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phase_seconds[name] += elapsed
+            self.phase_calls[name] += 1
+            if table:
+                self.table_seconds[table][name] += elapsed
+
+    def iterate(self, iterable: Iterable[T], name: str) -> Iterator[T]:
+        # Time spent producing each item, e.g. reading and splitting a file
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.phase_seconds[name] += time.perf_counter() - started
+            self.phase_calls[name] += 1
+            yield item
+
+    def record_artifact(self, file_path: str, content: str):
+        if self.enabled:
+            self.artifact_bytes[file_path] = len(content.encode("utf-8"))
+
+    def report(self) -> Dict[str, Any]:
+        import tracemalloc
+
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        return {
+            "total_seconds": time.perf_counter() - self.started,
+            "peak_traced_memory_bytes": peak_bytes,
+            "phases": {
+                name: {"seconds": seconds, "calls": self.phase_calls[name]}
+                for name, seconds in sorted(self.phase_seconds.items())
+            },
+            "tables": {table: dict(phases) for table, phases in sorted(self.table_seconds.items())},
+            "artifacts": dict(sorted(self.artifact_bytes.items())),
+        }
+
+    def print_summary(self, report: Dict[str, Any], slowest_table_count: int = 10):
+        print(f"\n{'phase':<20}{'calls':>8}{'total ms':>12}")
+        for name, phase in report["phases"].items():
+            print(f"{name:<20}{phase['calls']:>8}{phase['seconds'] * 1000:>12.1f}")
+
+        slowest_tables = sorted(report["tables"].items(), key=lambda item: sum(item[1].values()), reverse=True)
+        if slowest_tables:
+            print(f"\n{'slowest tables':<40}{'total ms':>12}")
+            for table, phases in slowest_tables[:slowest_table_count]:
+                print(f"{table:<40}{sum(phases.values()) * 1000:>12.1f}")
+
+        artifact_sizes = report["artifacts"].values()
+        print(f"\nartifacts: {len(artifact_sizes)}, {sum(artifact_sizes) / 1024:.1f} KiB")
+        print(f"peak traced memory: {report['peak_traced_memory_bytes'] / 1024 / 1024:.1f} MiB")
+        print(f"total: {report['total_seconds'] * 1000:.1f} ms")
+
+    def dump(self, report: Dict[str, Any], output_path: str):
+        with open(output_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f">> Profile written to {output_path}")
+
+
+PROFILER = Profiler()
@@ -0,0 +1,191 @@
+from typing import Dict, List, Tuple
+
+from src.classes import Column
+from src.conf import EMBED_COLUMNS, EMBED_DEPTH, LABEL_COLUMNS, QUERY_COLUMNS
+from src.utils import get_foreign_detail_column_name
+
+
+# Tried in this order when picking the column that names a row
+LABEL_COLUMN_NAMES = ("name", "title", "label")
+
+
+def label_column(table_columns: List[Column]) -> Column | None:
+    # The column a row is shown by: LABEL_COLUMNS[table], else name / title /
+    # label, else the first text column
+    snake_table_name = table_columns[0].table_name.snake
+    by_name = {column.column_name.snake: column for column in table_columns}
+    configured = LABEL_COLUMNS.get(snake_table_name)
+    if configured is not None:
+        if configured not in by_name:
+            raise ValueError(f"LABEL_COLUMNS['{snake_table_name}'] names an unknown column: {configured}")
+        return by_name[configured]
+    for column_name in LABEL_COLUMN_NAMES:
+        if column_name in by_name:
+            return by_name[column_name]
+    for column in table_columns:
+        if column.sql_type in ("varchar", "text") and not column.is_primary_key:
+            return column
+    return None
+
+
+def primary_key_column(table_columns: List[Column]) -> Column | None:
+    return next((column for column in table_columns if column.is_primary_key), None)
+
+
+def has_lookup(related_columns: List[Column] | None) -> bool:
+    # Whether foreign key dropdowns can use the related table's lookup
+    # provider. A table without a parsed primary key has none, its dropdowns
+    # load the full provider. Tables that weren't parsed are assumed to have one.
+    return related_columns is None or primary_key_column(related_columns) is not None
+
+
+def dropdown_label(related_columns: List[Column] | None) -> str:
+    # The Dart String a foreign key dropdown item shows: the lookup's label,
+    # else the label column of the related Model, else its id
+    if has_lookup(related_columns):
+        return "item.label"
+    label = label_column(related_columns)
+    if label is None:
+        return "'${item.id}'"
+    if label.is_not_null:
+        return f"'${{item.{label.column_name.camel}}}'"
+    return f"'${{item.{label.column_name.camel} ?? item.id}}'"
+
+
+def _required_columns(table_columns: List[Column]) -> List[Column]:
+    # what <Table>Model.fromJson can't do without
+    return [column for column in table_columns if column.is_primary_key or column.is_not_null]
+
+
+def _configured_columns(table_columns: List[Column], column_names: List[str], setting: str) -> List[Column]:
+    # The configured columns in table order, checked against the Model:
+    # every column it declares required has to be selected
+    by_name = {column.column_name.snake: column for column in table_columns}
+    unknown = [column_name for column_name in column_names if column_name not in by_name]
+    if unknown:
+        raise ValueError(f"{setting} names unknown columns: {', '.join(unknown)}")
+    missing = [
+        column.column_name.snake for column in _required_columns(table_columns) if column.column_name.snake not in column_names
+    ]
+    if missing:
+        model_name = table_columns[0].table_name.cap_camel + "Model"
+        raise ValueError(f"{setting} leaves out {', '.join(missing)}, {model_name}.fromJson needs them")
+    return [column for column in table_columns if column.column_name.snake in column_names]
+
+
+def query_columns(table_columns: List[Column]) -> List[Column]:
+    # Columns the list query of a table selects: QUERY_COLUMNS[table] or all of them
+    snake_table_name = table_columns[0].table_name.snake
+    column_names = QUERY_COLUMNS.get(snake_table_name)
+    if column_names is None:
+        return list(table_columns)
+    return _configured_columns(table_columns, column_names, f"QUERY_COLUMNS['{snake_table_name}']")
+
+
+def embed_columns(foreign_key: Column, related_columns: List[Column]) -> List[Column]:
+    # Columns of the related table embedded through foreign_key:
+    # EMBED_COLUMNS["<table>.<column>"], else EMBED_COLUMNS["<related table>"],
+    # else the key and not null columns plus the label column. Columns left
+    # out are nullable in the related Model and stay null.
+    relation_key = f"{foreign_key.table_name.snake}.{foreign_key.column_name.snake}"
+    setting_key = relation_key if relation_key in EMBED_COLUMNS else foreign_key.related_table_name.snake
+    column_names = EMBED_COLUMNS.get(setting_key)
+    if column_names is not None:
+        return _configured_columns(related_columns, column_names, f"EMBED_COLUMNS['{setting_key}']")
+
+    label = label_column(related_columns)
+    return [
+        column
+        for column in related_columns
+        if column.is_primary_key or column.is_not_null or column is label
+    ]
+
+
+def embed_depth(foreign_key: Column) -> int:
+    # How deep the row foreign_key references is embedded: EMBED_DEPTH["<table>.<column>"],
+    # else EMBED_DEPTH["<table>"], else 1
+    relation_key = f"{foreign_key.table_name.snake}.{foreign_key.column_name.snake}"
+    setting_key = relation_key if relation_key in EMBED_DEPTH else foreign_key.table_name.snake
+    depth = EMBED_DEPTH.get(setting_key, 1)
+    if not isinstance(depth, int) or depth < 0:
+        raise ValueError(f"EMBED_DEPTH['{setting_key}'] has to be a depth of 0 or more, not {depth!r}")
+    return depth
+
+
+def max_embed_depth() -> int:
+    # How many foreign keys away the artifacts of a table read from, the
+    # dropdowns of its view read the referenced table itself
+    return max([1, *(depth for depth in EMBED_DEPTH.values() if isinstance(depth, int))])
+
+
+def embedded_relations(table_columns: List[Column]) -> List[Column]:
+    # The foreign keys whose related row the query selects and the Model has a
+    # field for. auth.users can't be embedded.
+    return [
+        column
+        for column in table_columns
+        if column.related_table_name.snake
+        and column.related_table_name.snake != "auth.users"
+        and column.column_name.snake != "user_id"
+        and embed_depth(column) > 0
+    ]
+
+
+def related_tables_of(table_columns: List[Column], tables_by_name: Dict[str, List[Column]]) -> Dict[str, List[Column]]:
+    # The parsed columns of every table table_columns references (for the
+    # view's dropdowns) or embeds, nested embeds included
+    related_tables: Dict[str, List[Column]] = {
+        column.related_table_name.snake: tables_by_name[column.related_table_name.snake]
+        for column in table_columns
+        if column.related_table_name.snake in tables_by_name
+    }
+    # deepest depth a table was reached with, a cycle ends when its depth runs out
+    reached: Dict[str, int] = {}
+    pending = [(column, embed_depth(column)) for column in embedded_relations(table_columns)]
+    while pending:
+        foreign_key, depth = pending.pop()
+        snake_related_table_name = foreign_key.related_table_name.snake
+        if snake_related_table_name not in tables_by_name or reached.get(snake_related_table_name, 0) >= depth:
+            continue
+        reached[snake_related_table_name] = depth
+        related_columns = tables_by_name[snake_related_table_name]
+        related_tables[snake_related_table_name] = related_columns
+        if depth > 1:
+            pending.extend((column, depth - 1) for column in embedded_relations(related_columns))
+    return related_tables
+
+
+def select_list(columns: List[Column]) -> str:
+    return ", ".join(column.column_name.snake for column in columns)
+
+
+def _embed_select(foreign_key: Column, depth: int, related_tables: Dict[str, List[Column]]) -> Tuple[str, int]:
+    # "detail:fk ( columns )" for the row foreign_key references, with the
+    # relations of that row nested while depth lasts, and the number of
+    # embedded rows in it
+    foreign_detail_column_name = get_foreign_detail_column_name(foreign_key.column_name.snake)
+    related_columns = related_tables.get(foreign_key.related_table_name.snake)
+    if not related_columns:
+        return f"{foreign_detail_column_name.snake}:{foreign_key.column_name.snake} ( * )", 1
+
+    selected = [select_list(embed_columns(foreign_key, related_columns))]
+    fan_out = 1
+    if depth > 1:
+        for nested_foreign_key in embedded_relations(related_columns):
+            nested_select, nested_fan_out = _embed_select(nested_foreign_key, depth - 1, related_tables)
+            selected.append(nested_select)
+            fan_out += nested_fan_out
+    return f"{foreign_detail_column_name.snake}:{foreign_key.column_name.snake} ( {', '.join(selected)} )", fan_out
+
+
+def embedded_selects(table_columns: List[Column], related_tables: Dict[str, List[Column]]) -> Tuple[List[str], int]:
+    # The embed of every relation of the table's query and the number of
+    # related rows they embed per row. This is all its artifacts read from
+    # other tables, see dependency_fingerprint() in src/manifest.py.
+    selects: List[str] = []
+    fan_out = 0
+    for foreign_key in embedded_relations(table_columns):
+        select, embedded_fan_out = _embed_select(foreign_key, embed_depth(foreign_key), related_tables)
+        selects.append(select)
+        fan_out += embedded_fan_out
+    return selects, fan_out
@@ -0,0 +1,127 @@
+import os
+from typing import Dict, List, Sequence, Tuple
+
+from src.classes import Column, SqlEnum
+from src.profiling import PROFILER
+from src.projection import related_tables_of
+from src.sql_to_enum import renderEnumClass
+from src.sql_to_model import renderModel
+from src.sql_to_provider import renderProvider, renderRealtimeRows
+from src.sql_to_view import renderView
+from src.targets import (
+    Artifact,
+    ENUMS_FOLDER,
+    MODELS_FOLDER,
+    PROVIDERS_FOLDER,
+    REALTIME_ROWS_FILE_NAME,
+    TARGETS,
+    VIEWS_FOLDER,
+)
+from src.templating import TEMPLATES
+
+
+def render_table_artifacts(
+    table_columns: List[Column],
+    project_name: str,
+    targets: Sequence[str] = TARGETS,
+    related_tables: Dict[str, List[Column]] | None = None,
+    referenced: bool = False,
+) -> List[Artifact]:
+    # related_tables holds the columns of the tables table_columns references,
+    # referenced tells whether other tables reference it
+    snake_table_name = table_columns[0].table_name.snake
+    artifacts: List[Artifact] = []
+    if "models" in targets:
+        with PROFILER.phase("render:model", snake_table_name):
+            dart_model = renderModel(table_columns, project_name)
+        artifacts.append((os.path.join(MODELS_FOLDER, f"{snake_table_name}_model.dart"), dart_model))
+    if "providers" in targets:
+        with PROFILER.phase("render:provider", snake_table_name):
+            dart_provider = renderProvider(table_columns, project_name, related_tables, referenced)
+        artifacts.append((os.path.join(PROVIDERS_FOLDER, f"{snake_table_name}_provider.dart"), dart_provider))
+    if "views" in targets:
+        with PROFILER.phase("render:view", snake_table_name):
+            dart_view = renderView(table_columns, project_name, related_tables)
+        if dart_view is not None:
+            artifacts.append((os.path.join(VIEWS_FOLDER, f"{snake_table_name}_view.dart"), dart_view))
+    return artifacts
+
+
+def render_enum_artifacts(sql_enum: SqlEnum) -> List[Artifact]:
+    with PROFILER.phase("render:enum"):
+        dart_enum_class = renderEnumClass(sql_enum)
+    return [(os.path.join(ENUMS_FOLDER, f"{sql_enum.enum_name.snake}_class.dart"), dart_enum_class)]
+
+
+def render_support_artifacts(uses_realtime: bool) -> List[Tuple[str, List[Artifact]]]:
+    # (manifest key, artifacts) of the Dart helpers generated providers import
+    support: List[Tuple[str, List[Artifact]]] = []
+    if uses_realtime:
+        support.append(
+            ("support:realtime_rows", [(os.path.join(PROVIDERS_FOLDER, REALTIME_ROWS_FILE_NAME), renderRealtimeRows())])
+        )
+    return support
+
+
+def _render_table_job(
+    job: Tuple[List[Column], str, Sequence[str], Dict[str, List[Column]], bool]
+) -> List[Artifact]:
+    return render_table_artifacts(*job)
+
+
+def render_all(
+    tables: List[List[Column]],
+    sql_enums: List[SqlEnum],
+    project_name: str,
+    jobs: int = 1,
+    targets: Sequence[str] = TARGETS,
+    tables_by_name: Dict[str, List[Column]] | None = None,
+) -> Tuple[List[List[Artifact]], List[List[Artifact]]]:
+    # Rendering a table or an enum is independent once the schema is parsed.
+    # Results come back in input order, so the output is the same for any jobs.
+    # tables_by_name holds every parsed table, embedded relations select from it.
+    tables_by_name = tables_by_name or {}
+    referenced_tables = {
+        column.related_table_name.snake for table_columns in tables_by_name.values() for column in table_columns
+    }
+    if jobs <= 1 or len(tables) + len(sql_enums) <= 1:
+        return (
+            [
+                render_table_artifacts(
+                    table_columns,
+                    project_name,
+                    targets,
+                    related_tables_of(table_columns, tables_by_name),
+                    table_columns[0].table_name.snake in referenced_tables,
+                )
+                for table_columns in tables
+            ],
+            [render_enum_artifacts(sql_enum) for sql_enum in sql_enums],
+        )
+
+    # multiprocessing is slow to import and only needed with --jobs
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(tables) // (jobs * 4))
+    # Workers use the same template overrides, already compiled when forked
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=TEMPLATES.configure,
+        initargs=(TEMPLATES.override_directory, TEMPLATES.cache_path),
+    ) as pool:
+        table_artifacts = pool.map(
+            _render_table_job,
+            [
+                (
+                    table_columns,
+                    project_name,
+                    targets,
+                    related_tables_of(table_columns, tables_by_name),
+                    table_columns[0].table_name.snake in referenced_tables,
+                )
+                for table_columns in tables
+            ],
+            chunksize=chunksize,
+        )
+        enum_artifacts = pool.map(render_enum_artifacts, sql_enums)
+        return list(table_artifacts), list(enum_artifacts)
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import pickle
+from typing import Any, Dict
+
+from src.classes import ParsedSqlFile
+from src.manifest import GENERATOR_VERSION
+
+
+# in the project's cache directory, see utils.project_cache_directory()
+SCHEMA_CACHE_FILE_NAME = "schema_cache.pickle"
+
+# Bump when the IR classes in src/classes.py change shape (3: plain __slots__
+# classes instead of dataclasses, so older pickles no longer load cleanly)
+SCHEMA_CACHE_VERSION = 3
+
+
+def file_sha256(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class SchemaCache:
+    # <project cache directory>/schema_cache.pickle, maps every SQL file to its
+    # size, mtime, content hash and parsed IR. Never inside the project, a
+    # pickle runs code when it is loaded.
+    def __init__(self, cache_path: str):
+        self.cache_path = cache_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.previous_entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, cache_path: str) -> "SchemaCache":
+        cache = cls(cache_path)
+        if not os.path.exists(cache_path):
+            return cache
+        try:
+            with open(cache_path, "rb") as f:
+                data = pickle.load(f)
+        except Exception:
+            print(f">> Ignoring unreadable schema cache: {cache_path}")
+            return cache
+
+        # Upgrading the generator invalidates every entry
+        if data.get("version") == (GENERATOR_VERSION, SCHEMA_CACHE_VERSION):
+            cache.previous_entries = data.get("entries", {})
+        return cache
+
+    def get(self, file_path: str) -> ParsedSqlFile | None:
+        key = os.path.basename(file_path)
+        entry = self.previous_entries.get(key)
+        if not entry:
+            return None
+
+        stat = os.stat(file_path)
+        if stat.st_size != entry["size"]:
+            return None
+        if stat.st_mtime_ns != entry["mtime_ns"]:
+            # Touched but maybe not edited, the content hash decides
+            if file_sha256(file_path) != entry["sha256"]:
+                return None
+            entry = dict(entry, mtime_ns=stat.st_mtime_ns)
+            self.dirty = True
+
+        self.entries[key] = entry
+        return entry["parsed"]
+
+    def put(self, file_path: str, parsed: ParsedSqlFile):
+        stat = os.stat(file_path)
+        self.entries[os.path.basename(file_path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_sha256(file_path),
+            "parsed": parsed,
+        }
+        self.dirty = True
+
+    def save(self):
+        # Files that were not seen this run are dropped
+        if not self.dirty and self.entries.keys() == self.previous_entries.keys():
+            return
+        os.makedirs(os.path.dirname(self.cache_path), mode=0o700, exist_ok=True)
+        with open(self.cache_path, "wb") as f:
+            pickle.dump(
+                {"version": (GENERATOR_VERSION, SCHEMA_CACHE_VERSION), "entries": self.entries},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
@@ -0,0 +1,83 @@
+import re
+from typing import Iterator, NamedTuple
+
+
+# Token kinds
+WORD = "word"  # keywords and unquoted identifiers
+QUOTED = "quoted"  # "quoted identifiers", value is the unquoted name
+STRING = "string"  # 'string literals', value is the unquoted text
+NUMBER = "number"
+PUNCT = "punct"  # ( ) , ; .
+OTHER = "other"
+
+
+class Token(NamedTuple):
+    kind: str
+    value: str
+    # lowercased WORD, so keyword comparisons are case-insensitive without
+    # lowering the whole file; empty for every other kind
+    keyword: str = ""
+
+
+SQL_KEYWORDS = frozenset(
+    [
+        "select", "from", "where", "insert", "into", "values", "update", "set", "delete", "create", "table", "alter", "add", "drop", "column", "constraint", "primary", "key", "foreign", "references", "join", "inner", "left", "right", "full", "outer", "on", "group", "by", "order", "having", "distinct", "union", "all", "and", "or", "not", "null", "is", "in", "exists", "between", "like", "limit", "offset",
+        "type", "as", "enum", "if", "only", "replace", "default", "unique", "check", "cascade",
+    ]
+)
+
+
+# One alternation, scanned left to right with finditer, so the whole file is
+# lexed in a single linear pass. Comments and dollar-quoted bodies ($$ ... $$)
+# are matched as a whole and dropped.
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<space>\s+)
+    |(?P<line_comment>--[^\n]*)
+    |(?P<block_comment>/\*[\s\S]*?\*/)
+    |(?P<dollar>\$(?P<tag>(?:[A-Za-z_]\w*)?)\$[\s\S]*?\$(?P=tag)\$)
+    |(?P<string>'(?:[^']|'')*')
+    |(?P<quoted>"(?:[^"]|"")*")
+    |(?P<number>\d+(?:\.\d+)?)
+    |(?P<word>[A-Za-z_][\w$]*)
+    |(?P<punct>[(),;.])
+    |(?P<other>.)
+    """,
+    re.VERBOSE,
+)
+
+_SKIPPED_GROUPS = {"space", "line_comment", "block_comment", "dollar"}
+
+
+def tokenize_sql(sql_content: str) -> Iterator[Token]:
+    for match in _TOKEN_PATTERN.finditer(sql_content):
+        group = match.lastgroup
+        if group in _SKIPPED_GROUPS:
+            continue
+        text = match.group()
+        if group == "word":
+            yield Token(WORD, text, text.lower())
+        elif group == "punct":
+            yield Token(PUNCT, text)
+        elif group == "quoted":
+            yield Token(QUOTED, text[1:-1].replace('""', '"'))
+        elif group == "string":
+            yield Token(STRING, text[1:-1].replace("''", "'"))
+        elif group == "number":
+            yield Token(NUMBER, text)
+        else:
+            yield Token(OTHER, text)
+
+
+def fold_sql_keywords(sql_content: str) -> str:
+    # Lowercase SQL keywords in one pass. Identifiers, "quoted identifiers",
+    # 'string literals', comments and $$ bodies are left untouched.
+    def fold(match: re.Match[str]) -> str:
+        text = match.group()
+        if match.lastgroup == "word":
+            keyword = text.lower()
+            if keyword in SQL_KEYWORDS:
+                return keyword
+        return text
+
+    return _TOKEN_PATTERN.sub(fold, sql_content)
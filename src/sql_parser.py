@@ -0,0 +1,265 @@
+from typing import Iterable, List
+
+from src.classes import (
+    SqlColumnDef,
+    SqlEnumDef,
+    SqlForeignKeyDef,
+    SqlSchema,
+    SqlTableDef,
+)
+from src.profiling import PROFILER
+from src.sql_lexer import PUNCT, QUOTED, STRING, WORD, Token, tokenize_sql
+from src.sql_splitter import iter_sql_statements
+
+
+# Elements of a CREATE TABLE body that are constraints rather than columns
+TABLE_CONSTRAINT_KEYWORDS = {"constraint", "primary", "foreign", "unique", "check", "exclude", "like"}
+
+# Modifiers allowed between CREATE and TABLE
+CREATE_TABLE_MODIFIERS = {"global", "local", "temp", "temporary", "unlogged"}
+
+
+class _TokenCursor:
+    def __init__(self, tokens: List[Token]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def at_end(self) -> bool:
+        return self.pos >= len(self.tokens)
+
+    def peek(self) -> Token | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def peek_word(self) -> str:
+        token = self.peek()
+        return token.keyword if token else ""
+
+    def accept(self, *words: str) -> bool:
+        # Consume the given keywords if they are next, in that order
+        end = self.pos + len(words)
+        if end > len(self.tokens):
+            return False
+        for token, word in zip(self.tokens[self.pos:end], words):
+            if token.keyword != word:
+                return False
+        self.pos = end
+        return True
+
+    def accept_punct(self, punct: str) -> bool:
+        token = self.peek()
+        if token and token.kind == PUNCT and token.value == punct:
+            self.pos += 1
+            return True
+        return False
+
+    def identifier(self) -> str:
+        token = self.peek()
+        if token and token.kind in (WORD, QUOTED):
+            self.pos += 1
+            return token.value
+        return ""
+
+    def qualified_name(self) -> str:
+        # schema.name, with the default "public" schema dropped
+        parts = [self.identifier()]
+        while self.accept_punct("."):
+            parts.append(self.identifier())
+        if len(parts) > 1 and parts[0] == "public":
+            parts = parts[1:]
+        return ".".join(parts)
+
+    def parenthesized(self) -> List[Token] | None:
+        # Consume a balanced ( ... ) group and return the tokens inside it
+        if not self.accept_punct("("):
+            return None
+        start = self.pos
+        depth = 1
+        while self.pos < len(self.tokens):
+            token = self.tokens[self.pos]
+            self.pos += 1
+            if token.kind == PUNCT:
+                if token.value == "(":
+                    depth += 1
+                elif token.value == ")":
+                    depth -= 1
+                    if depth == 0:
+                        return self.tokens[start : self.pos - 1]
+        return self.tokens[start:]
+
+    def identifier_list(self) -> List[str]:
+        inner = self.parenthesized() or []
+        return [token.value for token in inner if token.kind in (WORD, QUOTED)]
+
+
+def split_on_commas(tokens: List[Token]) -> List[List[Token]]:
+    # Split on top level commas only, so "numeric(10,2)" stays in one piece
+    parts: List[List[Token]] = [[]]
+    depth = 0
+    for token in tokens:
+        if token.kind == PUNCT:
+            if token.value == "(":
+                depth += 1
+            elif token.value == ")":
+                depth -= 1
+            elif token.value == "," and depth == 0:
+                parts.append([])
+                continue
+        parts[-1].append(token)
+    return [part for part in parts if part]
+
+
+def parse_sql_statements(statements: Iterable[str]) -> SqlSchema:
+    schema = SqlSchema()
+    # "read" covers reading and splitting the file, see src/sql_splitter.py
+    for statement in PROFILER.iterate(statements, "read"):
+        with PROFILER.phase("parse"):
+            parse_sql_statement(statement, schema)
+    return schema
+
+
+def parse_sql_schema(sql_content: str) -> SqlSchema:
+    return parse_sql_statements(iter_sql_statements(sql_content.splitlines(keepends=True)))
+
+
+def parse_sql_file(file_path: str) -> SqlSchema:
+    # Streams the file one statement at a time, see src/sql_splitter.py
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        return parse_sql_statements(iter_sql_statements(f))
+
+
+def parse_sql_statement(statement: str, schema: SqlSchema):
+    cursor = _TokenCursor(list(tokenize_sql(statement)))
+    if cursor.accept("create"):
+        cursor.accept("or", "replace")
+        while cursor.peek_word() in CREATE_TABLE_MODIFIERS:
+            cursor.pos += 1
+        if cursor.accept("table"):
+            _parse_create_table(cursor, schema)
+        elif cursor.accept("type"):
+            _parse_create_enum(cursor, schema)
+    elif cursor.accept("alter", "table"):
+        _parse_alter_table(cursor, schema)
+
+
+def _parse_create_table(cursor: _TokenCursor, schema: SqlSchema):
+    cursor.accept("if", "not", "exists")
+    table_name = cursor.qualified_name()
+    body = cursor.parenthesized()
+    if not table_name or body is None:
+        # e.g. CREATE TABLE ... AS SELECT
+        return
+
+    table = SqlTableDef(table_name=table_name, columns=[])
+    constraints: List[List[Token]] = []
+    for element in split_on_commas(body):
+        first = element[0]
+        if first.keyword in TABLE_CONSTRAINT_KEYWORDS:
+            constraints.append(element)
+        else:
+            table.columns.append(_parse_column_def(element))
+
+    # Table constraints may refer to columns declared after them
+    columns_by_name = {column.column_name: column for column in table.columns}
+    for element in constraints:
+        _apply_table_constraint(_TokenCursor(element), columns_by_name)
+
+    schema.add_table(table)
+
+
+def _parse_column_def(element: List[Token]) -> SqlColumnDef:
+    cursor = _TokenCursor(element)
+    column_name = cursor.identifier()
+
+    type_token = cursor.peek()
+    sql_type = cursor.qualified_name().split(".")[-1]
+    if type_token and type_token.kind == WORD:
+        sql_type = sql_type.lower()
+
+    related_table_name = ""
+    is_not_null = False
+    is_primary_key = False
+    while not cursor.at_end():
+        if cursor.parenthesized() is not None:
+            # type modifiers, defaults and checks
+            continue
+        if cursor.accept("not", "null"):
+            is_not_null = True
+        elif cursor.accept("primary", "key"):
+            is_primary_key = True
+        elif cursor.accept("references"):
+            related_table_name = cursor.qualified_name()
+        else:
+            cursor.pos += 1
+
+    return SqlColumnDef(
+        column_name=column_name,
+        sql_type=sql_type,
+        related_table_name=related_table_name,
+        is_not_null=is_not_null,
+        is_primary_key=is_primary_key,
+    )
+
+
+def _apply_table_constraint(cursor: _TokenCursor, columns_by_name: dict[str, SqlColumnDef]):
+    if cursor.accept("constraint"):
+        cursor.identifier()
+
+    if cursor.accept("primary", "key"):
+        for column_name in cursor.identifier_list():
+            if column_name in columns_by_name:
+                columns_by_name[column_name].is_primary_key = True
+    elif cursor.accept("foreign", "key"):
+        column_names = cursor.identifier_list()
+        if cursor.accept("references"):
+            related_table_name = cursor.qualified_name()
+            for column_name in column_names:
+                if column_name in columns_by_name:
+                    columns_by_name[column_name].related_table_name = related_table_name
+
+
+def _parse_create_enum(cursor: _TokenCursor, schema: SqlSchema):
+    enum_name = cursor.qualified_name()
+    if not cursor.accept("as", "enum"):
+        return
+    values = cursor.parenthesized() or []
+    schema.enums.append(
+        SqlEnumDef(
+            enum_name=enum_name,
+            enum_values=[token.value for token in values if token.kind == STRING],
+        )
+    )
+
+
+def _parse_alter_table(cursor: _TokenCursor, schema: SqlSchema):
+    # dbdiagram.io exported postgres SQL file uses an "ALTER TABLE" statement to add foreign keys
+    # ALTER TABLE "entries" ADD FOREIGN KEY ("item_id") REFERENCES "items" ("id") ON DELETE CASCADE ON UPDATE CASCADE;
+    cursor.accept("if", "exists")
+    cursor.accept("only")
+    table_name = cursor.qualified_name()
+    if not cursor.accept("add"):
+        return
+    if cursor.accept("constraint"):
+        cursor.identifier()
+    if cursor.accept("primary", "key"):
+        # pg_dump adds primary keys with ALTER TABLE ONLY ... ADD CONSTRAINT ... PRIMARY KEY
+        table = schema.tables_by_name.get(table_name)
+        primary_key_column_names = cursor.identifier_list()
+        if table:
+            for column in table.columns:
+                if column.column_name in primary_key_column_names:
+                    column.is_primary_key = True
+        return
+    if not cursor.accept("foreign", "key"):
+        return
+    column_names = cursor.identifier_list()
+    if not cursor.accept("references"):
+        return
+    related_table_name = cursor.qualified_name()
+    for column_name in column_names:
+        schema.add_foreign_key(
+            SqlForeignKeyDef(
+                table_name=table_name,
+                column_name=column_name,
+                related_table_name=related_table_name,
+            )
+        )
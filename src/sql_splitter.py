@@ -0,0 +1,124 @@
+import re
+from typing import Iterable, Iterator, List
+
+
+# Only these statements end up in the schema IR, everything else (INSERT,
+# SELECT, GRANT, ...) is scanned for its terminating ";" but never buffered
+BUFFERED_STATEMENTS = {"create", "alter", "copy"}
+
+_SPECIAL_PATTERN = re.compile(r"""'|"|--|/\*|\$(?:[A-Za-z_]\w*)?\$|;""")
+_FIRST_WORD_PATTERN = re.compile(r"\s*([A-Za-z_]\w*)")
+_COPY_FROM_STDIN_PATTERN = re.compile(r"\bfrom\s+stdin\b", re.IGNORECASE)
+
+# End of a COPY ... FROM stdin data block
+COPY_DATA_END = "\\."
+
+
+class _StatementSplitter:
+    def __init__(self):
+        self.buffer: List[str] = []
+        self.first_word: str | None = None
+        self.skipping = False
+        # the closing text we are looking for: "'", '"', "*/" or "$tag$"
+        self.closer: str | None = None
+        # "literal", "comment" or "dollar"
+        self.quoted_kind = ""
+        self.in_copy_data = False
+
+    def _append(self, text: str):
+        if self.skipping or not text:
+            return
+        if self.first_word is None:
+            match = _FIRST_WORD_PATTERN.match(text)
+            if match:
+                self.first_word = match.group(1).lower()
+                if self.first_word not in BUFFERED_STATEMENTS:
+                    self.skipping = True
+                    self.buffer = []
+                    return
+            elif text.strip():
+                self.first_word = ""
+        self.buffer.append(text)
+
+    def _end_statement(self) -> str | None:
+        statement = "".join(self.buffer).strip()
+        is_copy_from_stdin = self.first_word == "copy" and _COPY_FROM_STDIN_PATTERN.search(statement)
+        self.buffer = []
+        self.first_word = None
+        self.skipping = False
+        if is_copy_from_stdin:
+            # the data rows start on the next line
+            self.in_copy_data = True
+            return None
+        return statement or None
+
+    def feed_line(self, line: str) -> Iterator[str]:
+        if self.in_copy_data:
+            if line.rstrip("\r\n") == COPY_DATA_END:
+                self.in_copy_data = False
+            return
+
+        pos = 0
+        while pos < len(line):
+            if self.closer is not None:
+                end = line.find(self.closer, pos)
+                if end == -1:
+                    self._append_quoted(line[pos:])
+                    return
+                end += len(self.closer)
+                self._append_quoted(line[pos:end])
+                self.closer = None
+                pos = end
+                continue
+
+            match = _SPECIAL_PATTERN.search(line, pos)
+            if not match:
+                self._append(line[pos:])
+                return
+            self._append(line[pos : match.start()])
+            special = match.group()
+            pos = match.end()
+
+            if special == ";":
+                statement = self._end_statement()
+                if statement:
+                    yield statement
+            elif special == "--":
+                # drop the comment, keep the line break
+                self._append("\n")
+                return
+            elif special == "/*":
+                self.closer = "*/"
+                self.quoted_kind = "comment"
+            elif special.startswith("$"):
+                # function bodies are skipped, the parser never looks inside them
+                self.closer = special
+                self.quoted_kind = "dollar"
+                self._append(" ")
+            else:
+                self.closer = special
+                self.quoted_kind = "literal"
+                self._append(special)
+
+    def _append_quoted(self, text: str):
+        # string literals and quoted identifiers are kept, comments and $$ bodies are not
+        if self.quoted_kind == "literal":
+            self._append(text)
+
+    def finish(self) -> Iterator[str]:
+        if not self.skipping and not self.in_copy_data:
+            statement = "".join(self.buffer).strip()
+            if statement:
+                yield statement
+        self.buffer = []
+
+
+def iter_sql_statements(sql_lines: Iterable[str]) -> Iterator[str]:
+    # Yield CREATE / ALTER statements (without the ";") one at a time while
+    # reading the file, or any iterable of lines, line by line. Memory stays
+    # flat for any dump size: COPY ... FROM stdin data blocks and $$ bodies
+    # are skipped without being buffered.
+    splitter = _StatementSplitter()
+    for line in sql_lines:
+        yield from splitter.feed_line(line)
+    yield from splitter.finish()
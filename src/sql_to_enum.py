@@ -2,84 +2,50 @@ import os
 from typing import List
 import re
 from src.classes import SqlEnum
+from src.templating import TEMPLATES
+from src.utils import write_to_file
 
-def sqlEnumsToDartClasses(sql_enums: List[SqlEnum], enums_directory: str):
 
-    for sql_enum in sql_enums:
-        # Convert enum name to CamelCase for Dart class name
-        cap_camel_enum_name = sql_enum.enum_name.cap_camel
-        dart_class_name = cap_camel_enum_name
-        snake_enum_name = sql_enum.enum_name.snake
-        camel_enum_name = sql_enum.enum_name.camel
-
-        # Convert enum values to Dart static variables
-        dart_static_vars: List[str] = []
-        var_names: List[str] = []
-        
-        for value in sql_enum.enum_values:
-            # Split the value into words
-            words: List[str] = re.split(r'\W+', value)
-            # Convert value to camelCase for Dart variable name
-            var_name = ''.join(word.capitalize() for word in words).replace(' ', '')
-            var_name = var_name[0].lower() + var_name[1:]
-            dart_static_vars.append(f'  static const {dart_class_name} {var_name} = {dart_class_name}._("{value}");')
-            var_names.append(var_name)
-
-        dart_static_vars_str = '\n'.join(dart_static_vars)
-        # Construct the static list
-        # dart_static_list_str = '  static const List<{dart_class_name}> all = [\n' + ',\n'.join(f'    {name}' for name in var_names) + '\n  ];'
-
-        dart_static_list_str = f"""
-        static const List<{dart_class_name}> all = [
-            {',\n'.join(var_names)}
-        ];
-        """
-
-        # Construct Dart class
-        # dart_class_str = f'class {dart_class_name} {{\n' + '\n'.join(dart_static_vars) + '\n\n' + dart_static_list_str + '\n}'
-
-        dart_class_str = f"""
-        class {dart_class_name} {{
-        
-            final String name;
-
-            const {dart_class_name}._(this.name);
-
-            @override
-            String toString() => name;
-
-            {dart_static_vars_str}
-            {dart_static_list_str}
+NON_WORD_PATTERN = re.compile(r'\W+')
 
 
-            static {dart_class_name} fromJson(String value) {{
-            return all.firstWhere(
-                (item) => item.name == value,
-                orElse: () => {dart_class_name}._(value) // Create a new item if no match is found
-            );
-            }}
+def sqlEnumsToDartClasses(sql_enums: List[SqlEnum], enums_directory: str) -> int:
 
-            static String toJson({dart_class_name} {camel_enum_name}) {{
-                return {camel_enum_name}.name;
-            }}
-
-            static {dart_class_name} fromString(String value) {{
-                return fromJson(value);
-            }}
-
-
-        }}
-        """
-
-        
-
-        output_file = os.path.join(enums_directory, f"{snake_enum_name}_class.dart")
-
-        # Check if the file exists and delete it if it does
-        if os.path.exists(output_file):
-            os.remove(output_file)
-            print(f"Deleted existing file: {output_file}")
-
-        with open(output_file, "w") as f:
-            f.write(dart_class_str.strip())
-        print(f">> SQL Enum Dart Class written to {output_file}")
+    written_count = 0
+    for sql_enum in sql_enums:
+        output_file = os.path.join(enums_directory, f"{sql_enum.enum_name.snake}_class.dart")
+        if write_to_file(output_file, renderEnumClass(sql_enum)):
+            written_count += 1
+
+    return written_count
+
+
+def renderEnumClass(sql_enum: SqlEnum) -> str:
+    # Convert enum name to CamelCase for Dart class name
+    cap_camel_enum_name = sql_enum.enum_name.cap_camel
+    dart_class_name = cap_camel_enum_name
+    snake_enum_name = sql_enum.enum_name.snake
+    camel_enum_name = sql_enum.enum_name.camel
+
+    # Convert enum values to Dart static variables
+    dart_static_vars: List[str] = []
+    var_names: List[str] = []
+    value_entries: List[str] = []
+
+    for value in sql_enum.enum_values:
+        # Split the value into words
+        words: List[str] = NON_WORD_PATTERN.split(value)
+        # Convert value to camelCase for Dart variable name
+        var_name = ''.join(word.capitalize() for word in words).replace(' ', '')
+        var_name = var_name[0].lower() + var_name[1:]
+        dart_static_vars.append(f'  static const {dart_class_name} {var_name} = {dart_class_name}._("{value}");')
+        var_names.append(var_name)
+        value_entries.append(f'"{value}": {var_name}')
+
+    return TEMPLATES.get("enum").render(
+        dart_class_name=dart_class_name,
+        dart_static_vars="\n".join(dart_static_vars),
+        value_names=",\n".join(var_names),
+        value_entries=",\n".join(value_entries),
+        camel_enum_name=camel_enum_name,
+    ).strip()
@@ -1,16 +1,26 @@
 import os
 from typing import List
 
-from src.classes import Column, SqlEnum
-from src.utils import snake_to_camel
+from src.classes import Column
+from src.projection import embedded_relations
+from src.templating import TEMPLATES
+from src.utils import snake_to_camel, write_to_file
 
 
-def sqlToModel(table_columns: List[Column], models_directory: str, project_name: str, enums: List[SqlEnum]=[]):
+def sqlToModel(table_columns: List[Column], models_directory: str, project_name: str) -> bool:
+    snake_table_name = table_columns[0].table_name.snake
+    output_file = os.path.join(models_directory, f"{snake_table_name}_model.dart")
+    return write_to_file(output_file, renderModel(table_columns, project_name))
+
+
+def renderModel(table_columns: List[Column], project_name: str) -> str:
     snake_table_name = table_columns[0].table_name.snake
 
 
     import_related_model_lines:List[str] = []
     model_attritute_lines: List[str] = []
+    # a field for every row the provider query embeds, see EMBED_DEPTH
+    embedded_column_names = {column.column_name.snake for column in embedded_relations(table_columns)}
     for column in table_columns:
         snake_column_name = column.column_name.snake
         camel_column_name = column.column_name.camel
@@ -35,7 +45,7 @@ def sqlToModel(table_columns: List[Column], models_directory: str, project_name:
         json_key_content = f"name: '{snake_column_name}'" if "_" in snake_column_name else ""
 
         if column.is_enum:
-            matching_enum = next((enum for enum in enums if column.sql_type == enum.enum_name.snake), None)
+            matching_enum = column.sql_enum
 
             if matching_enum:
                 dart_class_name = matching_enum.enum_name.cap_camel
@@ -49,7 +59,7 @@ def sqlToModel(table_columns: List[Column], models_directory: str, project_name:
         model_attritute_lines.append(f"{json_key} {required_mark} {dart_type}{question_mark} {camel_column_name},")
 
         snake_related_table_name:str = column.related_table_name.snake
-        if snake_related_table_name and snake_related_table_name != "auth.users":
+        if snake_column_name in embedded_column_names:
 
             import_related_model = f"import 'package:{project_name}/models/{snake_related_table_name}_model.dart';"
             import_related_model_lines.append(import_related_model)
@@ -82,32 +92,9 @@ def sqlToModel(table_columns: List[Column], models_directory: str, project_name:
     import_related_model_lines = list(dict.fromkeys(import_related_model_lines))
     import_related_models_str = "\n".join(import_related_model_lines)
 
-    dart_model = f"""
-import 'package:freezed_annotation/freezed_annotation.dart';
-{import_related_models_str}
-
-part '{snake_table_name}_model.freezed.dart';
-part '{snake_table_name}_model.g.dart';
-
-@freezed
-class {model_name} with _${model_name} {{
-  @JsonSerializable(includeIfNull: false)
-  factory {model_name}({{
-{dart_columns_str}
-  }}) = _{model_name};
-
-  factory {model_name}.fromJson(Map<String, dynamic> json) =>
-      _${model_name}FromJson(json);
-}}
-"""
-
-    output_file = os.path.join(models_directory, f"{snake_table_name}_model.dart")
-
-    # Check if the file exists and delete it if it does
-    if os.path.exists(output_file):
-        os.remove(output_file)
-        print(f"Deleted existing file: {output_file}")
-
-    with open(output_file, "w") as f:
-        f.write(dart_model.strip())
-    print(f">> Model written to {output_file}")
+    return TEMPLATES.get("model").render(
+        import_related_models=import_related_models_str,
+        snake_table_name=snake_table_name,
+        model_name=model_name,
+        dart_columns=dart_columns_str,
+    ).strip()
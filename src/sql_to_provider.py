@@ -1,11 +1,67 @@
 import os
-from typing import List
+from typing import Dict, List
 from src.classes import Column
 from src.sql_to_provider_query import sqlToProviderQuery
-from src.conf import DEBUG_PRINT_IN_PROVIDER
-
-
-def sqlToProvider(table_columns: List[Column], providers_directory: str, project_name: str):
+from src.conf import DEBUG_PRINT_IN_PROVIDER, PAGE_SIZE, REALTIME_INTERVAL_MILLISECONDS, REALTIME_TABLES
+from src.pagination import Pagination, table_pagination
+from src.projection import embedded_relations, label_column, primary_key_column
+from src.targets import PROVIDERS_FOLDER, REALTIME_ROWS_FILE_NAME
+from src.templating import TEMPLATES
+from src.utils import write_to_file
+
+
+def sqlToProvider(
+    table_columns: List[Column],
+    providers_directory: str,
+    project_name: str,
+    related_tables: Dict[str, List[Column]] | None = None,
+    referenced: bool = False,
+) -> bool:
+    snake_table_name = table_columns[0].table_name.snake
+    output_file = os.path.join(providers_directory, f"{snake_table_name}_provider.dart")
+    return write_to_file(output_file, renderProvider(table_columns, project_name, related_tables, referenced))
+
+
+def renderProvider(
+    table_columns: List[Column],
+    project_name: str,
+    related_tables: Dict[str, List[Column]] | None = None,
+    referenced: bool = False,
+) -> str:
+    # referenced: another table's foreign keys point at this one, its views
+    # need a lookup provider for their dropdowns. Without a primary key there
+    # is none, the dropdowns load the full provider (see projection.has_lookup).
+    has_lookup = referenced and primary_key_column(table_columns) is not None
+    provider = _renderProvider(table_columns, project_name, related_tables, has_lookup)
+    if not has_lookup:
+        return provider
+    return provider + "\n\n" + renderLookupProvider(table_columns)
+
+
+def renderLookupProvider(table_columns: List[Column]) -> str:
+    snake_table_name = table_columns[0].table_name.snake
+    primary_key = primary_key_column(table_columns)
+    if primary_key is None:
+        raise ValueError(f"{snake_table_name} has no primary key to look rows up by")
+    label = label_column(table_columns) or primary_key
+    select_columns = list(dict.fromkeys([primary_key.column_name.snake, label.column_name.snake]))
+    return TEMPLATES.get("provider_lookup").render(
+        snake_table_name=snake_table_name,
+        camel_table_name=table_columns[0].table_name.camel,
+        cap_camel_table_name=table_columns[0].table_name.cap_camel,
+        id_type=primary_key.dart_type,
+        snake_primary_key=primary_key.column_name.snake,
+        snake_label_column=label.column_name.snake,
+        select_columns=", ".join(select_columns),
+    ).strip()
+
+
+def _renderProvider(
+    table_columns: List[Column],
+    project_name: str,
+    related_tables: Dict[str, List[Column]] | None,
+    has_lookup: bool,
+) -> str:
 
 
     snake_table_name = table_columns[0].table_name.snake
@@ -15,63 +71,165 @@ def sqlToProvider(table_columns: List[Column], providers_directory: str, project
     import_for_debug = "import 'package:flutter/widgets.dart';" if DEBUG_PRINT_IN_PROVIDER else ""
     debug_print = f"debugPrint(\">> {snake_table_name}_provider response[0]:\\n${{(response.isNotEmpty ? response[0] : 'empty')}}\\n\");" if DEBUG_PRINT_IN_PROVIDER else ""
 
-    query_content = sqlToProviderQuery(table_columns=table_columns)
-
-    # Dart provider template
-    provider_template = f"""
-import 'dart:async';
-
-{import_for_debug}
-import 'package:{project_name}/models/{snake_table_name}_model.dart';
-import 'package:riverpod_annotation/riverpod_annotation.dart';
-import 'package:supabase_flutter/supabase_flutter.dart';
-
-part '{snake_table_name}_provider.g.dart';
-
-final supabase = Supabase.instance.client;
-
-{query_content}
-
-@riverpod
-class {cap_camel_table_name} extends _${cap_camel_table_name} {{
-  @override
-  Future<List<{cap_camel_table_name}Model>> build() async {{
-    final response = await supabase.from('{snake_table_name}').select({camel_table_name}Query);
-    {debug_print}
-    return response.map({cap_camel_table_name}Model.fromJson).toList();
-  }}
-
-  String? getUserId() {{
-    return supabase.auth.currentUser?.id;
-  }}
-
-  Future<void> upsert({cap_camel_table_name}Model type) async {{
-    await supabase
-        .from('{snake_table_name}')
-        .upsert(type.toJson(), onConflict: "id");
-
-    ref.invalidateSelf();
-    await future;
-  }}
-
-  Future<void> delete(int? id) async {{
-    if (id != null) {{
-      await supabase.from('{snake_table_name}').delete().eq('id', id);
-    }}
-
-    ref.invalidateSelf();
-    await future;
-  }}
-}}
-"""
-
-    output_file = os.path.join(providers_directory, f"{snake_table_name}_provider.dart")
-
-    # Check if the file exists and delete it if it does
-    if os.path.exists(output_file):
-        os.remove(output_file)
-        print(f"Deleted existing file: {output_file}")
-
-    with open(output_file, "w") as f:
-        f.write(provider_template.strip())
-    print(f">> Provider written to {output_file}")
+    query_content = sqlToProviderQuery(table_columns=table_columns, related_tables=related_tables)
+
+    pagination = table_pagination(table_columns)
+    realtime = snake_table_name in REALTIME_TABLES
+
+    primary_key = primary_key_column(table_columns)
+    # upsert / delete patch the loaded rows by primary key instead of fetching
+    # the table again. Without one (no lookup either) they load the table again.
+    if primary_key is None:
+        mutations = TEMPLATES.get("provider_mutations_refresh").render(
+            snake_table_name=snake_table_name,
+            cap_camel_table_name=cap_camel_table_name,
+        )
+    else:
+        mutations = _renderMutations(table_columns, primary_key, pagination, has_lookup)
+    import_realtime = ""
+    if realtime:
+        mutations = renderRealtimeMembers(table_columns, pagination) + mutations
+        import_realtime = f"\nimport 'package:{project_name}/{PROVIDERS_FOLDER}/{REALTIME_ROWS_FILE_NAME}';"
+
+    if pagination is not None:
+        return renderPaginatedProvider(
+            table_columns,
+            project_name,
+            pagination,
+            import_for_debug,
+            query_content,
+            debug_print,
+            mutations,
+            import_realtime,
+            "_subscribed(await _fetchPage(null))" if realtime else "_fetchPage(null)",
+        )
+
+    build_rows = f"response.map({cap_camel_table_name}Model.fromJson).toList()"
+    return TEMPLATES.get("provider").render(
+        mutations=mutations,
+        import_for_debug=import_for_debug,
+        import_realtime=import_realtime,
+        project_name=project_name,
+        snake_table_name=snake_table_name,
+        query_content=query_content,
+        cap_camel_table_name=cap_camel_table_name,
+        camel_table_name=camel_table_name,
+        debug_print=debug_print,
+        build_rows=f"_subscribed({build_rows})" if realtime else build_rows,
+    ).strip()
+
+
+def _renderMutations(
+    table_columns: List[Column], primary_key: Column, pagination: Pagination | None, has_lookup: bool
+) -> str:
+    camel_table_name = table_columns[0].table_name.camel
+    return TEMPLATES.get("provider_mutations").render(
+        snake_table_name=table_columns[0].table_name.snake,
+        camel_table_name=camel_table_name,
+        cap_camel_table_name=table_columns[0].table_name.cap_camel,
+        snake_primary_key=primary_key.column_name.snake,
+        camel_primary_key=primary_key.column_name.camel,
+        primary_key_type=primary_key.dart_type,
+        # the lookup has the old label or misses the new row
+        after_write=f"\n      ref.invalidate({camel_table_name}LookupProvider);" if has_lookup else "",
+        append_row=(
+            "return [...rows, row];"
+            if pagination is None
+            # loadMore() fetches the page after the last row, so a row appended
+            # before the last page is loaded would skip the pages in between
+            else "// a row of a page not loaded yet shows up with that page\n"
+            "      return _hasMore ? rows : [...rows, row];"
+        ),
+    )
+
+
+def renderRealtimeMembers(table_columns: List[Column], pagination: Pagination | None) -> str:
+    # Subscribes the provider to the table's realtime changes, see realtime_rows.dart
+    snake_table_name = table_columns[0].table_name.snake
+    primary_key = next((column for column in table_columns if column.is_primary_key), None)
+    if primary_key is None:
+        raise ValueError(f"REALTIME_TABLES: {snake_table_name} has no primary key to patch rows by")
+
+    realtime_options: List[str] = []
+    # a change only carries the table's own columns, embedded relations are read again
+    if embedded_relations(table_columns):
+        realtime_options.append(
+            f"fetch: (ids) async => (await supabase.from('{snake_table_name}')"
+            f".select({table_columns[0].table_name.camel}Query).inFilter('{primary_key.column_name.snake}', ids))"
+            f".map({table_columns[0].table_name.cap_camel}Model.fromJson).toList(),"
+        )
+    # new rows belong after rows that aren't loaded yet
+    if pagination is not None:
+        realtime_options.append("acceptsInserts: () => !_hasMore,")
+
+    return TEMPLATES.get("provider_realtime").render(
+        snake_table_name=snake_table_name,
+        cap_camel_table_name=table_columns[0].table_name.cap_camel,
+        snake_primary_key=primary_key.column_name.snake,
+        camel_primary_key=primary_key.column_name.camel,
+        interval_milliseconds=str(REALTIME_INTERVAL_MILLISECONDS),
+        realtime_options="".join(f"\n      {option}" for option in realtime_options),
+    )
+
+
+def renderRealtimeRows() -> str:
+    # the Dart helper every realtime provider imports
+    return TEMPLATES.get("realtime_rows").render().strip()
+
+
+def _keyset_value(column: Column) -> str:
+    # the column of the last loaded row, as a quoted filter value
+    esclam = "!" if not column.is_not_null else ""
+    return f"${{_keysetValue(after.{column.column_name.camel}{esclam})}}"
+
+
+def renderPaginatedProvider(
+    table_columns: List[Column],
+    project_name: str,
+    pagination: Pagination,
+    import_for_debug: str,
+    query_content: str,
+    debug_print: str,
+    mutations: str,
+    import_realtime: str,
+    build_rows: str,
+) -> str:
+    snake_table_name = table_columns[0].table_name.snake
+    primary_key = pagination.primary_key
+    order_column = pagination.order_column
+    snake_primary_key = primary_key.column_name.snake
+
+    if order_column is None:
+        esclam = "!" if not primary_key.is_not_null else ""
+        keyset_filter = f"query = query.gt('{snake_primary_key}', after.{primary_key.column_name.camel}{esclam});"
+        keyset_order = f".order('{snake_primary_key}', ascending: true)"
+        keyset_helpers = ""
+    else:
+        # (order column, primary key) > the last row's
+        snake_order_column = order_column.column_name.snake
+        keyset_filter = (
+            f"query = query.or('{snake_order_column}.gt.{_keyset_value(order_column)},"
+            f"and({snake_order_column}.eq.{_keyset_value(order_column)},{snake_primary_key}.gt.{_keyset_value(primary_key)})');"
+        )
+        keyset_order = (
+            f".order('{snake_order_column}', ascending: true).order('{snake_primary_key}', ascending: true)"
+        )
+        keyset_helpers = TEMPLATES.get("provider_keyset_helpers").render()
+
+    return TEMPLATES.get("provider_paginated").render(
+        mutations=mutations,
+        import_for_debug=import_for_debug,
+        import_realtime=import_realtime,
+        build_rows=build_rows,
+        project_name=project_name,
+        snake_table_name=snake_table_name,
+        query_content=query_content,
+        cap_camel_table_name=table_columns[0].table_name.cap_camel,
+        camel_table_name=table_columns[0].table_name.camel,
+        page_size=str(PAGE_SIZE),
+        keyset_helpers=keyset_helpers,
+        keyset_filter=keyset_filter,
+        keyset_order=keyset_order,
+        camel_primary_key=primary_key.column_name.camel,
+        debug_print=debug_print,
+    ).strip()
@@ -1,32 +1,29 @@
-from typing import List
+from typing import Dict, List
 
-from src.classes import Column, NameVariant
-from src.utils import get_foreign_detail_column_name
+from src.classes import Column
+from src.projection import embedded_selects, query_columns, select_list
+from src.templating import TEMPLATES
 
 
-def sqlToProviderQuery(table_columns: List[Column]):
+def sqlToProviderQuery(table_columns: List[Column], related_tables: Dict[str, List[Column]] | None = None):
+    # Selects only the projected columns (src/projection.py) of the table and
+    # of every embedded table. A related table that wasn't parsed falls back to *.
     camel_table_name = table_columns[0].table_name.camel
+    related_tables = related_tables or {}
 
-    related_columns = [col for col in table_columns if col.related_table_name.snake and col.column_name.snake != "user_id"]
+    embedded, _ = embedded_selects(table_columns, related_tables)
 
-    related_query_lines:List[str] = []
-    for idx, col in enumerate(related_columns):
-        snake_foreign_key_name = col.column_name.snake
-
-        foreign_detail_column_name :NameVariant = get_foreign_detail_column_name(snake_foreign_key_name)
-        related_query_lines.append(
-            f"{foreign_detail_column_name.snake}:{snake_foreign_key_name} ( * ){'' if idx == len(related_columns) - 1 else ','}"
-        )
-    query_all_str = f"*{"," if related_query_lines else ''}"
+    related_query_lines:List[str] = [
+        f"{select}{'' if idx == len(embedded) - 1 else ','}" for idx, select in enumerate(embedded)
+    ]
+    query_all_str = f"{select_list(query_columns(table_columns))}{"," if related_query_lines else ''}"
     related_queries_str = "\n".join(related_query_lines)
 
-    content = f"""
-const {camel_table_name}Query = '''
-{query_all_str}
-{related_queries_str}
-''';
-"""
-    return content
+    return TEMPLATES.get("provider_query").render(
+        camel_table_name=camel_table_name,
+        query_all=query_all_str,
+        related_queries=related_queries_str,
+    )
 
     # file_path = os.path.join(
     #     providers_folder, f"{snake_table_name}_provider_query.dart"
@@ -1,17 +1,34 @@
 import os
-from typing import List
+from typing import Dict, List
 
 from src.classes import Column, SqlEnum
-from src.utils import snake_to_title_case
+from src.pagination import table_pagination
+from src.projection import dropdown_label, has_lookup, primary_key_column
+from src.templating import TEMPLATES
+from src.utils import log, snake_to_title_case, write_to_file
 
 
 
 
-def sqlToView(table_columns: List[Column],  views_directory: str, project_name: str, enums: List[SqlEnum]=[]):
+def sqlToView(table_columns: List[Column],  views_directory: str, project_name: str) -> bool:
+    dart_class = renderView(table_columns, project_name)
+    if dart_class is None:
+        return False
+    snake_table_name = table_columns[0].table_name.snake
+    output_file = os.path.join(views_directory, f"{snake_table_name}_view.dart")
+    return write_to_file(output_file, dart_class)
+
+
+def renderView(
+    table_columns: List[Column], project_name: str, related_tables: Dict[str, List[Column]] | None = None
+) -> str | None:
+    # related_tables holds the columns of the tables table_columns references
+    related_tables = related_tables or {}
+
     # if no column named id, return
     if not any(column.column_name.snake == "id" for column in table_columns):
-        print("No id column found. Skipping view generation.")
-        return
+        log("No id column found. Skipping view generation.")
+        return None
 
     snake_table_name = table_columns[0].table_name.snake
     camel_table_name = table_columns[0].table_name.camel
@@ -54,7 +71,7 @@ def sqlToView(table_columns: List[Column],  views_directory: str, project_name:
             text_form_field_columns.append(column)
 
         if column.is_enum:
-            matching_enum = next((enum for enum in enums if column.sql_type == enum.enum_name.snake), None)
+            matching_enum = column.sql_enum
             if matching_enum:
                 import_sql_enums_dart_classes_columns.append(matching_enum)
 
@@ -102,8 +119,11 @@ def sqlToView(table_columns: List[Column],  views_directory: str, project_name:
         if snake_related_table_name:
             camel_related_table_name = column.related_table_name.camel
 
+            # only ids and labels, see the lookup provider in the related provider
+            # file, unless the related table has no primary key to look rows up by
+            related_provider = "LookupProvider" if has_lookup(related_tables.get(snake_related_table_name)) else "Provider"
             build_provider_lines.append(
-                f"final {column.column_name.camel}AsyncValue = ref.watch({camel_related_table_name}Provider);"
+                f"final {column.column_name.camel}AsyncValue = ref.watch({camel_related_table_name}{related_provider});"
             )
     build_providers_str = "\n".join(build_provider_lines)
 
@@ -117,7 +137,8 @@ def sqlToView(table_columns: List[Column],  views_directory: str, project_name:
         import_provider_lines.append(
             f"import 'package:{project_name}/providers/{column.related_table_name.snake}_provider.dart';"
         )
-    import_provider_lines = list(set(import_provider_lines))
+    # Remove duplicates while maintaining order, so imports are stable between runs
+    import_provider_lines = list(dict.fromkeys(import_provider_lines))
     import_providers_str = "\n".join(import_provider_lines)
 
     # construct import sql enums dart classes
@@ -126,8 +147,8 @@ def sqlToView(table_columns: List[Column],  views_directory: str, project_name:
         import_sql_enums_dart_classes_lines.append(
             f"import 'package:{project_name}/sql_enums_dart_classes/{enum.enum_name.snake}_class.dart';"
         )
-    # Remove duplicates
-    import_sql_enums_dart_classes_lines = list(set(import_sql_enums_dart_classes_lines))
+    # Remove duplicates while maintaining order
+    import_sql_enums_dart_classes_lines = list(dict.fromkeys(import_sql_enums_dart_classes_lines))
     import_sql_enums_dart_classes_str = "\n".join(import_sql_enums_dart_classes_lines)
 
     # construct TextFormFields for each column
@@ -141,94 +162,49 @@ def sqlToView(table_columns: List[Column],  views_directory: str, project_name:
 
         if column.sql_type == "date":
             text_form_field_lines.append(
-                f"""
-                TextFormField(
-                controller: {column.column_name.camel}Controller,
-                decoration: const InputDecoration(labelText: '{snake_to_title_case(column.column_name.snake)}'),
-                readOnly: true,
-                onTap: () async {{
-                    DateTime? pickedDate = await showDatePicker(
-                    context: context,
-                    initialDate: DateTime.tryParse(initial{column.column_name.cap_camel} ?? "") ??
-                        DateTime.now(),
-                    firstDate: DateTime(1900),
-                    lastDate: DateTime(2200),
-                    );
-                    if (pickedDate != null) {{
-                    {column.column_name.camel}Controller.text = pickedDate.toIso8601String();
-                    }}
-                }},
-                ),
-                """
+                TEMPLATES.get("view_date_field").render(
+                    camel_column_name=column.column_name.camel,
+                    title_column_name=snake_to_title_case(column.column_name.snake),
+                    cap_camel_column_name=column.column_name.cap_camel,
+                )
             )
         if column.sql_type == "bigint" and column.column_name.snake.endswith("_id"):
             text_form_field_lines.append(
-                f"""
-                {column.column_name.camel}AsyncValue.when(
-                loading: () => const CircularProgressIndicator(),
-                error: (err, stack) => Text('Error: $err'),
-                data: (items) => DropdownButtonFormField<int>(
-                    decoration: const InputDecoration(labelText: '{snake_to_title_case(snake_col_name_without_id)}'),
-                    value: current{column.column_name.cap_camel},
-                    onChanged: (int? newValue) {{
-                    current{column.column_name.cap_camel} = newValue;
-                    }},
-                    items: items.map<DropdownMenuItem<int>>((item) {{
-                    return DropdownMenuItem<int>(
-                        value: item.id,
-                        child: const Text('An item'),
-                    );
-                    }}).toList(),
-                    hint: const Text('Select {snake_to_title_case(snake_col_name_without_id)}'),
-                ),
-                ),
-                """
+                TEMPLATES.get("view_foreign_key_field").render(
+                    camel_column_name=column.column_name.camel,
+                    title_column_name=snake_to_title_case(snake_col_name_without_id),
+                    cap_camel_column_name=column.column_name.cap_camel,
+                    item_label=dropdown_label(related_tables.get(column.related_table_name.snake)),
+                )
             )
 
         if column.is_enum:
-            matching_enum = next((enum for enum in enums if column.sql_type == enum.enum_name.snake), None)
+            matching_enum = column.sql_enum
 
             if matching_enum:
               text_form_field_lines.append(
-                  f"""
-                  DropdownButtonFormField<String>(
-                  decoration: const InputDecoration(labelText: '{snake_to_title_case(column.column_name.snake)}'),
-                  value: current{column.column_name.cap_camel},
-                  onChanged: (String? newValue) {{
-                      current{column.column_name.cap_camel} = newValue;
-                  }},
-                  items: {matching_enum.enum_name.cap_camel}.all.map(({matching_enum.enum_name.camel}) {{
-                    return DropdownMenuItem(
-                      value: {matching_enum.enum_name.camel}.toString(),
-                      child: Text({matching_enum.enum_name.camel}.toString()),
-                    );
-                  }}).toList(),
-                  hint: const Text('Select {snake_to_title_case(column.column_name.snake)}'),
-                  ),
-                  """
+                  TEMPLATES.get("view_enum_field").render(
+                      title_column_name=snake_to_title_case(column.column_name.snake),
+                      cap_camel_column_name=column.column_name.cap_camel,
+                      cap_camel_enum_name=matching_enum.enum_name.cap_camel,
+                      camel_enum_name=matching_enum.enum_name.camel,
+                  )
               )
 
 
         if column.sql_type == "text":
             text_form_field_lines.append(
-                f"""
-                TextFormField(
-                controller: {column.column_name.camel}Controller,
-                decoration: const InputDecoration(labelText: '{snake_to_title_case(column.column_name.snake)}'),
-                keyboardType: TextInputType.multiline,
-                minLines: 2,
-                maxLines: 8,
-                ),
-                """
+                TEMPLATES.get("view_text_field").render(
+                    camel_column_name=column.column_name.camel,
+                    title_column_name=snake_to_title_case(column.column_name.snake),
+                )
             )
         if column.sql_type == "varchar":
             text_form_field_lines.append(
-                f"""
-                TextFormField(
-                controller: {column.column_name.camel}Controller,
-                decoration: const InputDecoration(labelText: '{snake_to_title_case(column.column_name.snake)}'),
-                ),
-                """
+                TEMPLATES.get("view_varchar_field").render(
+                    camel_column_name=column.column_name.camel,
+                    title_column_name=snake_to_title_case(column.column_name.snake),
+                )
             )
         if (
             column.sql_type == "real"
@@ -236,13 +212,10 @@ def sqlToView(table_columns: List[Column],  views_directory: str, project_name:
             or (column.sql_type == "bigint" and not column.column_name.snake.endswith("_id"))
         ):
             text_form_field_lines.append(
-                f"""
-                TextFormField(
-                controller: {column.column_name.camel}Controller,
-                decoration: const InputDecoration(labelText: '{snake_to_title_case(column.column_name.snake)}'),
-                keyboardType: const TextInputType.numberWithOptions(decimal: true),
-                ),
-                """
+                TEMPLATES.get("view_number_field").render(
+                    camel_column_name=column.column_name.camel,
+                    title_column_name=snake_to_title_case(column.column_name.snake),
+                )
             )
 
     text_form_fields_str = "\n".join(text_form_field_lines)
@@ -262,7 +235,7 @@ def sqlToView(table_columns: List[Column],  views_directory: str, project_name:
                 f"{column.column_name.camel}: ref.read({camel_table_name}Provider.notifier).getUserId()!,"
             )
         elif column.is_enum:
-            matching_enum = next((enum for enum in enums if column.sql_type == enum.enum_name.snake), None)
+            matching_enum = column.sql_enum
             if matching_enum:
                 dialog_on_save_controller_param_lines.append(
                     f"{column.column_name.camel}: {matching_enum.enum_name.cap_camel}.fromString({column.column_name.camel}Controller.text),"
@@ -299,213 +272,30 @@ def sqlToView(table_columns: List[Column],  views_directory: str, project_name:
     ###############################################
     ###############################################
 
-    dart_class = f"""
-    import 'package:flutter/material.dart';
-    import 'package:flutter_hooks/flutter_hooks.dart';
-    import 'package:hooks_riverpod/hooks_riverpod.dart';
-    import 'package:{project_name}/models/{snake_table_name}_model.dart';
-    import 'package:{project_name}/providers/{snake_table_name}_provider.dart';
-    
-    {import_providers_str}
-    
-    {import_sql_enums_dart_classes_str}
-    
-    class {capitalized_camel_table_name}View extends HookConsumerWidget {{
-      static const routeName = '/{snake_table_name}';
-    
-      const {capitalized_camel_table_name}View({{super.key}});
-    
-      @override
-      Widget build(BuildContext context, WidgetRef ref) {{
-        final {camel_table_name}AsyncValue = ref.watch({camel_table_name}Provider);
-        final {camel_table_name} = useState<List<{capitalized_camel_table_name}Model>>([]);
-    
-        useEffect(() {{
-          {camel_table_name}.value = {camel_table_name}AsyncValue.maybeWhen(
-            data: (values) => values,
-            orElse: () => [],
-          );
-          return null;
-        }}, [{camel_table_name}AsyncValue]);
-    
-        return Scaffold(
-          appBar: AppBar(
-            title: const Text('{snake_to_title_case(snake_table_name)}'),
-            actions: [
-              IconButton(
-                icon: const Icon(Icons.refresh),
-                onPressed: () {{
-                  // ignore: unused_result
-                  ref.refresh({camel_table_name}Provider.future);
-                }},
-              ),
-            ],
-          ),
-          body: {camel_table_name}AsyncValue.when(
-            loading: () => const Center(child: CircularProgressIndicator()),
-            error: (error, stack) => Center(child: Text('Error: $error')),
-            data: (values) {{
-              return ListView.separated(
-                separatorBuilder: (context, index) => const Divider(),
-                itemCount: {camel_table_name}.value.length + 1,
-                itemBuilder: (context, index) {{
-                  if (index == {camel_table_name}.value.length) {{
-                    return const SizedBox(
-                        height: 70, child: Center(child: Text('The End')));
-                  }}
-                  final value = {camel_table_name}.value[index];
-                  return Dismissible(
-                    key: Key(value.id.toString()),
-                    direction: DismissDirection.endToStart,
-                    background: Container(
-                      color: Colors.red,
-                      alignment: Alignment.centerRight,
-                      padding: const EdgeInsets.symmetric(horizontal: 20.0),
-                      child: const Icon(Icons.delete, color: Colors.white),
-                    ),
-                    confirmDismiss: (direction) async {{
-                      bool? confirmDelete = await showDialog<bool>(
-                        context: context,
-                        builder: (BuildContext context) {{
-                          return AlertDialog(
-                            title: const Text('Confirm Deletion'),
-                            content: const Text('Are you sure you want to delete this?'),
-                            actions: <Widget>[
-                              TextButton(
-                                child: const Text('Cancel'),
-                                onPressed: () {{
-                                  Navigator.of(context).pop(false);
-                                }},
-                              ),
-                              TextButton(
-                                child: const Text('Delete'),
-                                onPressed: () {{
-                                  Navigator.of(context).pop(true);
-                                }},
-                              ),
-                            ],
-                          );
-                        }},
-                      );
-                      return confirmDelete;
-                    }},
-                    onDismissed: (direction) async {{
-                      {camel_table_name}.value = List.from({camel_table_name}.value)..removeAt(index);
-                      await ref.read({camel_table_name}Provider.notifier).delete(value.id);
-                    }},
-                    child: ListTile(
-                      title: const Text("{snake_table_name}"),
-                      subtitle: const Text("subtitle"),
-                      onTap: () async {{
-                        await showModalBottomSheet<bool>(
-                          isScrollControlled: true,
-                          context: context,
-                          builder: (BuildContext context) {{
-                            return _{capitalized_camel_table_name}Modal(
-                              context: context,
-                              {edit_button_params_str}
-                            );
-                          }},
-                        );
-                      }},
-                    ),
-                  );
-                }},
-              );
-            }},
-          ),
-          floatingActionButton: FloatingActionButton(
-            onPressed: () async {{
-              await showModalBottomSheet<bool>(
-                isScrollControlled: true,
-                context: context,
-                builder: (BuildContext context) {{
-                  return _{capitalized_camel_table_name}Modal(
-                    context: context,
-                  );
-                }},
-              );
-            }},
-            child: const Icon(Icons.add),
-          ),
-        );
-      }}
-    }}
-    
-    class _{capitalized_camel_table_name}Modal extends ConsumerWidget {{
-      final BuildContext context;
-      {dialog_properties_str}
-    
-      const _{capitalized_camel_table_name}Modal({{
-        required this.context,
-        {constructor_params_str}
-      }});
-    
-      @override
-      Widget build(BuildContext context, WidgetRef ref) {{
-        final isEdit = initialId != null;
-        {build_vars_str}
-    
-        {build_controller_str}
-    
-        {build_providers_str}
-    
-        return Padding(
-          padding: const EdgeInsets.all(16.0),
-          child: FractionallySizedBox(
-            heightFactor: 0.9,
-            child: Column(
-              children: [
-                Text(isEdit ? 'Edit' : 'Add', style: Theme.of(context).textTheme.titleLarge),
-                SizedBox(height: 8),
-                Expanded(
-                  child: SingleChildScrollView(
-                    child: Column(
-                      mainAxisSize: MainAxisSize.min,
-                      children: [
-                        {text_form_fields_str}
-                      ],
-                    ),
-                  ),
-                ),
-                SizedBox(height: 16),
-                Row(
-                  children: [
-                    TextButton(
-                      child: const Text('Cancel'),
-                      onPressed: () {{
-                        Navigator.of(context).pop(false);
-                      }},
-                    ),
-                    TextButton(
-                      child: const Text('Save'),
-                      onPressed: () async {{
-                        await ref.read({camel_table_name}Provider.notifier).upsert(
-                          {capitalized_camel_table_name}Model(
-                            {dialog_on_save_params_str}
-                          )
-                        );
-                        Navigator.of(context).pop(true);
-                      }},
-                    ),
-                  ],
-                ),
-                SizedBox(height: 16),
-              ],
-            ),
-          ),
-        );
-      }}
-    }}
-    """
-    
-    output_file = os.path.join(views_directory, f"{snake_table_name}_view.dart")
-
-    # Check if the file exists and delete it if it does
-    if os.path.exists(output_file):
-        os.remove(output_file)
-        print(f"Deleted existing file: {output_file}")
-
-    with open(output_file, "w") as f:
-        f.write(dart_class.strip())
-    print(f">> View written to {output_file}")
+    # paginated tables load the next page when the end of the list is built
+    list_end_template = "view_list_end_paginated" if table_pagination(table_columns) else "view_list_end"
+    list_end_str = TEMPLATES.get(list_end_template).render(camel_table_name=camel_table_name)
+
+    # the provider deletes by primary key, or by id when there is none
+    delete_key = primary_key_column(table_columns)
+    camel_delete_key = delete_key.column_name.camel if delete_key else "id"
+
+    return TEMPLATES.get("view").render(
+        project_name=project_name,
+        snake_table_name=snake_table_name,
+        import_providers=import_providers_str,
+        import_sql_enums_dart_classes=import_sql_enums_dart_classes_str,
+        cap_camel_table_name=capitalized_camel_table_name,
+        camel_table_name=camel_table_name,
+        title_table_name=snake_to_title_case(snake_table_name),
+        edit_button_params=edit_button_params_str,
+        dialog_properties=dialog_properties_str,
+        constructor_params=constructor_params_str,
+        build_vars=build_vars_str,
+        build_controller=build_controller_str,
+        build_providers=build_providers_str,
+        text_form_fields=text_form_fields_str,
+        dialog_on_save_params=dialog_on_save_params_str,
+        list_end=list_end_str,
+        camel_delete_key=camel_delete_key,
+    ).strip()
@@ -0,0 +1,23 @@
+from typing import Tuple
+
+
+# Output folders under lib/
+MODELS_FOLDER = "models"
+PROVIDERS_FOLDER = "providers"
+VIEWS_FOLDER = "views"
+ENUMS_FOLDER = "sql_enums_dart_classes"
+
+# What generate() can produce, and the folder under lib/ each one is written to
+TARGET_FOLDERS = {
+    "models": MODELS_FOLDER,
+    "providers": PROVIDERS_FOLDER,
+    "views": VIEWS_FOLDER,
+    "enums": ENUMS_FOLDER,
+}
+TARGETS = tuple(TARGET_FOLDERS)
+
+# Dart helper shared by the realtime providers, in PROVIDERS_FOLDER
+REALTIME_ROWS_FILE_NAME = "realtime_rows.dart"
+
+# (file path relative to lib/, content)
+Artifact = Tuple[str, str]
@@ -0,0 +1,183 @@
+import hashlib
+import importlib.util
+import keyword
+import marshal
+import os
+import re
+from types import CodeType
+from typing import Callable, Dict, FrozenSet, List
+
+
+# Built in templates, one <name>.dart.tmpl per generated file or view field
+TEMPLATES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+TEMPLATE_SUFFIX = ".dart.tmpl"
+
+# A Flutter project overrides a template by putting a file with the same name here
+TEMPLATE_OVERRIDES_FOLDER = "sfrf_templates"
+
+# in the project's cache directory, see utils.project_cache_directory()
+TEMPLATE_CACHE_FILE_NAME = "template_cache.marshal"
+
+# Bump when compile_template changes the code it generates
+TEMPLATE_COMPILER_VERSION = 2
+
+# {{ name }}, every other brace is copied as is
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*([A-Za-z_]\w*)\s*\}\}")
+
+
+def template_hash(source: str) -> str:
+    # marshalled code only loads in the Python version that wrote it
+    key = f"{TEMPLATE_COMPILER_VERSION}:{importlib.util.MAGIC_NUMBER.hex()}:{source}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def template_placeholders(source: str) -> FrozenSet[str]:
+    return frozenset(PLACEHOLDER_PATTERN.findall(source))
+
+
+def compile_template(name: str, source: str) -> CodeType:
+    # Turn the template into a module defining
+    #   def render(*, name, **unused): return f"literal{name}..."
+    # so rendering is one f-string, as fast as the hand written ones were
+    parts: List[str] = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(source):
+        if match.start() > position:
+            parts.append(_fstring_literal(source[position : match.start()]))
+        parts.append(f"f'{{{match.group(1)}}}'")
+        position = match.end()
+    if position < len(source):
+        parts.append(_fstring_literal(source[position:]))
+
+    placeholders = sorted(template_placeholders(source))
+    for placeholder in placeholders:
+        if keyword.iskeyword(placeholder):
+            raise ValueError(f"Placeholder {{{{ {placeholder} }}}} in template {name} is a reserved word")
+    # overrides don't have to use every placeholder the emitter passes
+    parameters = ", ".join(["*", *placeholders, "**unused"]) if placeholders else "**unused"
+    body = " ".join(parts) or "''"
+    return compile(f"def render({parameters}):\n    return {body}\n", f"<template {name}>", "exec")
+
+
+def _fstring_literal(text: str) -> str:
+    # repr() never adds braces of its own, so doubling them is enough
+    return "f" + repr(text).replace("{", "{{").replace("}", "}}")
+
+
+class Template:
+    def __init__(self, name: str, source: str, code: CodeType):
+        self.name = name
+        self.source = source
+        self.placeholders = template_placeholders(source)
+        namespace: Dict[str, Callable[..., str]] = {}
+        exec(code, namespace)
+        # called as template.render(name=value, ...)
+        self.render: Callable[..., str] = namespace["render"]
+
+
+class TemplateLoader:
+    # Reads and compiles every template once per process. The compiled code is
+    # kept in <project cache directory>/template_cache.marshal keyed by
+    # template hash, so later runs don't compile again. The cached code is
+    # executed, so the cache never lives inside the project. main.py
+    # configures the TEMPLATES instance.
+    def __init__(self):
+        self.override_directory: str | None = None
+        self.cache_path: str | None = None
+        self._templates: Dict[str, Template] = {}
+        self._cached_code: Dict[str, bytes] = {}
+        self._dirty = False
+
+    def configure(self, override_directory: str | None = None, cache_path: str | None = None):
+        if (override_directory, cache_path) == (self.override_directory, self.cache_path):
+            # Already set up, e.g. a forked --jobs worker or another generate()
+            # call in the same process. Only templates edited since are reloaded.
+            self._templates = {
+                name: template for name, template in self._templates.items() if template.source == self.source(name)
+            }
+            return
+        self.override_directory = override_directory
+        self.cache_path = cache_path
+        self._templates = {}
+        self._cached_code = {}
+        self._dirty = False
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    self._cached_code = marshal.load(f)
+            except Exception:
+                print(f">> Ignoring unreadable template cache: {cache_path}")
+
+    def names(self) -> List[str]:
+        return sorted(
+            file_name[: -len(TEMPLATE_SUFFIX)]
+            for file_name in os.listdir(TEMPLATES_DIRECTORY)
+            if file_name.endswith(TEMPLATE_SUFFIX)
+        )
+
+    def builtin_path(self, name: str) -> str:
+        return os.path.join(TEMPLATES_DIRECTORY, name + TEMPLATE_SUFFIX)
+
+    def template_path(self, name: str) -> str:
+        if self.override_directory:
+            override_path = os.path.join(self.override_directory, name + TEMPLATE_SUFFIX)
+            if os.path.isfile(override_path):
+                return override_path
+        return self.builtin_path(name)
+
+    def source(self, name: str) -> str:
+        # newline="" keeps the line endings of the template in the output
+        with open(self.template_path(name), "r", encoding="utf-8", newline="") as f:
+            return f.read()
+
+    def get(self, name: str) -> Template:
+        template = self._templates.get(name)
+        if template is None:
+            template = self._templates[name] = self._load(name)
+        return template
+
+    def _load(self, name: str) -> Template:
+        template_path = self.template_path(name)
+        source = self.source(name)
+        if template_path != self.builtin_path(name):
+            # An override can only use the placeholders the built in template gets
+            with open(self.builtin_path(name), "r", encoding="utf-8") as f:
+                unknown = template_placeholders(source) - template_placeholders(f.read())
+            if unknown:
+                raise ValueError(f"Unknown placeholders in {template_path}: {', '.join(sorted(unknown))}")
+
+        key = template_hash(source)
+        code: CodeType | None = None
+        if key in self._cached_code:
+            try:
+                code = marshal.loads(self._cached_code[key])
+            except Exception:
+                code = None
+        if code is None:
+            code = compile_template(name, source)
+            self._cached_code[key] = marshal.dumps(code)
+            self._dirty = True
+        return Template(name, source, code)
+
+    def render(self, name: str, **context: str) -> str:
+        return self.get(name).render(**context)
+
+    def fingerprint(self) -> str:
+        # Hash of every template in effect, editing an override regenerates everything
+        sha256 = hashlib.sha256()
+        for name in self.names():
+            sha256.update(f"{name}\0{self.source(name)}\0".encode("utf-8"))
+        return sha256.hexdigest()
+
+    def save_cache(self):
+        if not self.cache_path or not self._dirty:
+            return
+        # Code of templates that were edited since is dropped
+        current_keys = {template_hash(self.source(name)) for name in self.names()}
+        os.makedirs(os.path.dirname(self.cache_path), mode=0o700, exist_ok=True)
+        with open(self.cache_path, "wb") as f:
+            marshal.dump({key: code for key, code in self._cached_code.items() if key in current_keys}, f)
+        self._dirty = False
+
+
+TEMPLATES = TemplateLoader()
@@ -1,8 +1,51 @@
+import hashlib
 import os
-import re
-from typing import Any, List
+import sys
+from typing import Dict, List, Tuple
 
-from src.classes import Column, NameVariant, SqlEnum
+from src.classes import Column, EnumRegistry, NameVariant, ParsedSqlFile, SqlEnum, SqlSchema, SqlTableDef, get_name_variant
+from src.profiling import PROFILER
+
+
+# Map SQL types to Dart types
+SQL_TO_DART_TYPE_MAPPING = {
+    "bigint": "int",
+    "date": "String",
+    "real": "double",
+    "float8": "double",
+    "text": "String",
+    "uuid": "String",
+}
+
+
+# --quiet drops the per-file chatter, summaries are still printed
+QUIET: bool = False
+
+
+def set_quiet(quiet: bool):
+    global QUIET
+    QUIET = quiet
+
+
+def log(message: str):
+    if not QUIET:
+        print(message)
+
+
+def warn(message: str):
+    # problems the user should fix, on stderr and not hidden by --quiet
+    print(f">> Warning: {message}", file=sys.stderr)
+
+
+def project_cache_directory(lib_directory: str) -> str:
+    # Per project directory in the user's cache directory. Caches that are
+    # loaded as Python objects or code live here, not in the project, so a
+    # cache file committed to or shipped with a project can't run code.
+    cache_home = os.environ.get("XDG_CACHE_HOME") or (
+        os.environ.get("LOCALAPPDATA") if os.name == "nt" else None
+    ) or os.path.join(os.path.expanduser("~"), ".cache")
+    project_key = hashlib.sha256(os.path.realpath(lib_directory).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_home, "sfrf", project_key)
 
 
 def snake_to_camel(snake_str: str) -> str:
@@ -34,95 +77,57 @@ def extract_last_folder_name(path: str) -> str:
     return last_folder_name
 
 
-def write_to_file(file_path: str, content: str):
-    # Check if the file exists and delete it if it does
-    if os.path.exists(file_path):
-        os.remove(file_path)
-        print(f">> Deleted existing file: {file_path}")
+def write_to_file(file_path: str, content: str) -> bool:
+    # Only touch the file when its bytes change, so build_runner and the
+    # Dart analyzer don't see a new mtime for identical output
+    data = content.strip().encode("utf-8")
+    try:
+        with open(file_path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
 
-    with open(file_path, "w") as f:
-        f.write(content.strip())
-    print(f">> Written to {file_path}")
+    # Written next to the target and renamed over it, so readers never see half a file
+    temporary_path = file_path + ".sfrf-tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(data)
+    os.replace(temporary_path, file_path)
+    log(f">> Written to {file_path}")
+    return True
 
 
 def get_foreign_detail_column_name(snake_column_name: str) -> NameVariant:
     snake_foreign_detail_column_name = snake_column_name + "_detail"
     if snake_column_name.endswith("_id"):
         snake_foreign_detail_column_name = snake_column_name.split("_id")[0]
-    return NameVariant(
-        snake_name=snake_foreign_detail_column_name,
-    )
-
-
-def parse_table_columns(sql_create_table_statement: str, whole_sql_content: str="", enums: List[SqlEnum]=[]) -> List[Column] | None:
-    return_list: List[Column] | None = []
-    # Regex pattern to match CREATE TABLE statements
-    create_table_pattern = re.compile(
-        r"create table (\w+) \(([\s\S]*?)\);", re.IGNORECASE
-    )
-    match = create_table_pattern.search(sql_create_table_statement)
-    if not match:
-        return None
-
-    snake_table_name = match.group(1)
-    columns = match.group(2).split(",")
-
-    # dbdiagram.io exported postgres SQL file uses an "ALTER TABLE" statement to add foreign keys
-    # ALTER TABLE "entries" ADD FOREIGN KEY ("item_id") REFERENCES "items" ("id") ON DELETE CASCADE ON UPDATE CASCADE;
-    alter_table_add_foreign_key_pattern = re.compile(
-        r'ALTER\s+TABLE\s+\"?(\w+)\"?\s+ADD\s+FOREIGN\s+KEY\s+\(\"?(\w+)\"?\)\s+REFERENCES\s+\"?(\w+\"?\.?\"?\w+)\"?\s+\(\"?(\w+)\"?\)\s?(ON\s+DELETE\s+\w+\s?)?(ON\s+UPDATE\s+\w+\s?)?;', 
-        re.IGNORECASE
-    )
-    alter_table_add_foreign_key_matches:List[Any] = []
-    if whole_sql_content:
-        whole_sql_content = whole_sql_content.replace('"', "")
-        alter_table_add_foreign_key_matches = alter_table_add_foreign_key_pattern.findall(whole_sql_content)
-
-    # Map SQL types to Dart types
-    sql_to_dart_type_mapping = {
-        "bigint": "int",
-        "date": "String",
-        "real": "double",
-        "float8": "double",
-        "text": "String",
-        "uuid": "String",
-    }
-
-    
-    for column in columns:
-        column = column.strip()
-        column_parts = column.split()
-        snake_col_name, col_type = column_parts[:2]
-        col_type = col_type.strip().lower()
-        snake_col_name = snake_col_name.strip()
-
-        snake_related_table_name = ""
-        is_foreign_key = False
-        if "references" in column_parts:
-            snake_related_table_name = column_parts[
-                column_parts.index("references") + 1
-            ]
-            is_foreign_key = True
+    return get_name_variant(snake_foreign_detail_column_name)
+
+
+def parse_table_columns(table: SqlTableDef, schema: SqlSchema | None = None, enum_registry: EnumRegistry | None = None) -> List[Column]:
+    return_list: List[Column] = []
 
-        is_not_null = "not" in column_parts and "null" in column_parts
+    snake_table_name = table.table_name
 
-        is_primary_key = "primary" in column_parts and "key" in column_parts
+    # dbdiagram.io exported postgres SQL file uses an "ALTER TABLE" statement to add foreign keys,
+    # the parser indexes them by (table, column) once per schema
+    foreign_key_index: Dict[Tuple[str, str], str] = schema.foreign_key_index if schema else {}
 
-        if alter_table_add_foreign_key_matches:
-            for alter_table_add_foreign_key_match in alter_table_add_foreign_key_matches:
-                if snake_col_name == alter_table_add_foreign_key_match[1] and snake_table_name == alter_table_add_foreign_key_match[0]:
-                    snake_related_table_name = alter_table_add_foreign_key_match[2]
-                    is_foreign_key = True
-                    break
+    for column_def in table.columns:
+        snake_col_name = column_def.column_name
+        col_type = column_def.sql_type
+
+        snake_related_table_name = column_def.related_table_name
+        is_foreign_key = bool(snake_related_table_name)
+
+        alter_table_related_table_name = foreign_key_index.get((snake_table_name, snake_col_name))
+        if alter_table_related_table_name:
+            snake_related_table_name = alter_table_related_table_name
+            is_foreign_key = True
 
-        is_enum = False
-        if enums:
-            for enum in enums:
-                if col_type == enum.enum_name.snake:
-                    is_enum = True
-                    break
+        sql_enum = enum_registry.get(col_type) if enum_registry else None
 
-        dart_type = sql_to_dart_type_mapping.get(col_type, "String")
+        dart_type = SQL_TO_DART_TYPE_MAPPING.get(col_type, "String")
 
         column_obj = Column(
             table_name=snake_table_name,
@@ -130,49 +135,46 @@ def parse_table_columns(sql_create_table_statement: str, whole_sql_content: str=
             dart_type=dart_type,
             sql_type=col_type,
             related_table_name=snake_related_table_name,
-            is_not_null=is_not_null,
-            is_primary_key=is_primary_key,
+            is_not_null=column_def.is_not_null,
+            is_primary_key=column_def.is_primary_key,
             is_foreign_key=is_foreign_key,
-            is_enum=is_enum,
+            is_enum=sql_enum is not None,
+            sql_enum=sql_enum,
         )
 
         return_list.append(column_obj)
 
     return return_list
 
-def parse_sql_enums(sql_create_enum_statement: str) -> List[SqlEnum]:
-    return_list: List[SqlEnum] = []
-    # Regex pattern to match CREATE ENUM statements
-    create_enum_pattern = re.compile(
-        r'CREATE\s+TYPE\s+"?(\w+)"?\s+AS\s+ENUM\s*\(\s*([\s\S]*?)\s*\);', re.IGNORECASE
-    )
-    matches = create_enum_pattern.findall(sql_create_enum_statement)
-    if not matches:
-        return []
-
-    for match in matches:
-        snake_enum_name = match[0]
-        enum_values = match[1].split(",")
-
-        enum_values = [value.strip().replace("'", "") for value in enum_values]
-
-        enum_obj = SqlEnum(
-            enum_name=snake_enum_name,
-            enum_values=enum_values,
+def parse_sql_enums(schema: SqlSchema) -> List[SqlEnum]:
+    return [
+        SqlEnum(
+            enum_name=enum_def.enum_name,
+            enum_values=list(enum_def.enum_values),
         )
+        for enum_def in schema.enums
+    ]
 
-        return_list.append(enum_obj)
 
-    return return_list
+def parse_sql_file_tables(file_path: str) -> ParsedSqlFile:
+    # Stream the file one statement at a time and parse tables, enums and
+    # foreign keys in one pass, then resolve every table's columns.
+    # The parser is imported here so runs served from the schema cache skip it.
+    from src.sql_parser import parse_sql_file
 
+    schema = parse_sql_file(file_path)
+    enums = parse_sql_enums(schema)
+    enum_registry = EnumRegistry(enums)
+    tables: List[List[Column]] = []
+    for table in schema.tables:
+        with PROFILER.phase("columns", table.table_name):
+            table_columns = parse_table_columns(table, schema, enum_registry)
+        if table_columns:
+            tables.append(table_columns)
+    return ParsedSqlFile(schema=schema, enums=enums, tables=tables)
 
-def lowercase_sql_keywords(sql_statement: str)->str:
-    sql_keywords = [
-        "SELECT", "FROM", "WHERE", "INSERT", "INTO", "VALUES", "UPDATE", "SET", "DELETE", "CREATE", "TABLE", "ALTER", "ADD", "DROP", "COLUMN", "CONSTRAINT", "PRIMARY", "KEY", "FOREIGN", "REFERENCES", "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "OUTER", "ON", "GROUP", "BY", "ORDER", "HAVING", "DISTINCT", "UNION", "ALL", "AND", "OR", "NOT", "NULL", "IS", "IN", "EXISTS", "BETWEEN", "LIKE", "LIMIT", "OFFSET"
-    ]
 
-    for keyword in sql_keywords:
-        sql_statement = sql_statement.replace(keyword, keyword.lower())
-    
+def lowercase_sql_keywords(sql_statement: str)->str:
+    from src.sql_lexer import fold_sql_keywords
 
-    return sql_statement
\ No newline at end of file
+    return fold_sql_keywords(sql_statement)
@@ -0,0 +1,250 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from typing import Collection, Dict, Sequence, Set
+
+from src.classes import ParsedSqlFile
+from src.generator import GenerationStats, generate_files, list_sql_files
+from src.manifest import Manifest
+from src.schema_cache import SchemaCache
+from src.targets import TARGETS
+from src.utils import parse_sql_file_tables, warn
+
+
+# How long to keep collecting events after the first one, editors often
+# write a file in several steps (truncate, write, rename, chmod)
+DEBOUNCE_SECONDS = 0.05
+
+POLL_INTERVAL_SECONDS = 0.25
+
+# inotify(7) flags
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_CLOEXEC = 0o2000000
+
+_INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    def __init__(self, directory: str):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE | IN_MODIFY
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def _read_names(self, timeout: float | None) -> Set[str]:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        names: Set[str] = set()
+        offset = 0
+        while offset < len(data):
+            _, _, _, name_length = _INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT_HEADER.size
+            name = data[offset : offset + name_length].rstrip(b"\0")
+            offset += name_length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def wait(self) -> Set[str]:
+        # Block until something changes, then collect events until the burst is over
+        names = self._read_names(None)
+        while True:
+            more = self._read_names(DEBOUNCE_SECONDS)
+            if not more:
+                return names
+            names |= more
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    # Fallback for platforms without inotify: compare size and mtime of every file
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        snapshot: Dict[str, tuple] = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def _changes(self) -> Set[str]:
+        snapshot = self._scan()
+        changed = {
+            name
+            for name in snapshot.keys() | self.snapshot.keys()
+            if snapshot.get(name) != self.snapshot.get(name)
+        }
+        self.snapshot = snapshot
+        return changed
+
+    def wait(self) -> Set[str]:
+        while True:
+            names = self._changes()
+            if names:
+                break
+            time.sleep(POLL_INTERVAL_SECONDS)
+        while True:
+            time.sleep(DEBOUNCE_SECONDS)
+            more = self._changes()
+            if not more:
+                return names
+            names |= more
+
+    def close(self):
+        pass
+
+
+def create_watcher(directory: str):
+    try:
+        return InotifyWatcher(directory)
+    except (OSError, AttributeError) as e:
+        print(f">> inotify unavailable ({e}), polling {directory} instead")
+        return PollingWatcher(directory)
+
+
+def _touched_tables(parsed: ParsedSqlFile) -> Set[str]:
+    # the tables of a file and the tables they reference, whether those are
+    # referenced at all can change with the file
+    touched_tables: Set[str] = set()
+    for table_columns in parsed.tables:
+        touched_tables.add(table_columns[0].table_name.snake)
+        touched_tables.update(
+            column.related_table_name.snake for column in table_columns if column.related_table_name.snake
+        )
+    return touched_tables
+
+
+def _regenerate(
+    lib_directory: str,
+    project_name: str,
+    parsed_files: Dict[str, ParsedSqlFile],
+    changed_files: Set[str],
+    current_files: Set[str],
+    manifest: Manifest,
+    schema_cache: SchemaCache | None,
+    jobs: int,
+    rendered_contents: Dict[str, str],
+    targets: Sequence[str],
+    tables: Collection[str] | None,
+) -> GenerationStats:
+    # Parse the changed files again and regenerate what they affect.
+    # parsed_files and the manifest only change once everything succeeded.
+    reparsed_files: Dict[str, ParsedSqlFile] = {}
+    # the tables of the changed files before and after the change
+    touched_tables: Set[str] = set()
+    for file_path in sorted(changed_files):
+        if file_path in parsed_files:
+            touched_tables |= _touched_tables(parsed_files[file_path])
+        if file_path in current_files:
+            reparsed_files[file_path] = parse_sql_file_tables(file_path)
+            touched_tables |= _touched_tables(reparsed_files[file_path])
+            # keyed by the file's content, right even if the generation fails
+            if schema_cache:
+                schema_cache.put(file_path, reparsed_files[file_path])
+
+    next_parsed_files = {
+        file_path: parsed for file_path, parsed in parsed_files.items() if file_path not in changed_files
+    }
+    next_parsed_files.update(reparsed_files)
+    manifest.begin_update()
+    try:
+        # in file order, like the first run. Only the touched tables and the
+        # tables embedding them are fingerprinted again.
+        stats = generate_files(
+            lib_directory, project_name, [next_parsed_files[file_path] for file_path in sorted(next_parsed_files)],
+            manifest, jobs, rendered_contents, targets, tables, touched_tables=touched_tables,
+        )
+        manifest.save()
+    except BaseException:
+        manifest.abort_update()
+        raise
+
+    parsed_files.clear()
+    parsed_files.update(next_parsed_files)
+    return stats
+
+
+def watch(
+    lib_directory: str,
+    project_name: str,
+    parsed_files: Dict[str, ParsedSqlFile],
+    manifest: Manifest,
+    schema_cache: SchemaCache | None = None,
+    jobs: int = 1,
+    targets: Sequence[str] = TARGETS,
+    tables: Collection[str] | None = None,
+):
+    # Keep the parsed files (by path), the manifest and the rendered contents
+    # in memory. On every change only the changed SQL files are parsed again.
+    # Foreign keys cross files, so fingerprints are checked against the whole
+    # schema and the changed tables plus the tables embedding them are rendered.
+    sqls_directory = os.path.join(lib_directory, "sqls")
+    rendered_contents: Dict[str, str] = {}
+    watcher = create_watcher(sqls_directory)
+    print(f">> Watching {sqls_directory}, press Ctrl-C to stop")
+
+    try:
+        while True:
+            changed_names = watcher.wait()
+            started = time.perf_counter()
+
+            changed_list = ", ".join(sorted(changed_names))
+            try:
+                current_files = set(list_sql_files(sqls_directory))
+                changed_files = {os.path.join(sqls_directory, name) for name in changed_names}
+                changed_files = (changed_files & current_files) | (changed_files & parsed_files.keys())
+                if not changed_files:
+                    continue
+                changed_list = ", ".join(os.path.basename(file_path) for file_path in sorted(changed_files))
+                stats = _regenerate(
+                    lib_directory, project_name, parsed_files, changed_files, current_files, manifest,
+                    schema_cache, jobs, rendered_contents, targets, tables,
+                )
+            except Exception as e:
+                # e.g. a half saved file, a file deleted while it was read or a
+                # bad src/conf.py setting: keep the last good state and wait
+                # for the next save. Files may have been rendered but not
+                # written, so compare with the disk again.
+                rendered_contents.clear()
+                warn(f"{changed_list}: {type(e).__name__}: {e}, nothing was regenerated")
+                continue
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            print(
+                f">> {changed_list}: regenerated {stats.regenerated_count}, files written {stats.written_file_count} "
+                f"in {elapsed_ms:.0f} ms"
+            )
+    except KeyboardInterrupt:
+        print("\n>> Stopped watching")
+    finally:
+        watcher.close()
+        # Saved once on the way out rather than per change, pickling the whole
+        # schema took longer than the rest of a small change. A missed save
+        # only means a file is parsed again on the next start.
+        if schema_cache:
+            schema_cache.save()